@@ -0,0 +1,110 @@
+﻿from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from engine import MAX_VALUE, MIN_VALUE, TARGET_SUM, Board
+
+
+@dataclass
+class BatchAnalysis:
+    # 보드별 가능한 수(딱 맞는 10 사각형) 개수, shape (N,)
+    counts: np.ndarray
+    # 더 이상 수가 없는 보드, shape (N,)
+    dead: np.ndarray
+    # size_counts[n, k]: 사과 k개를 지우는 수의 개수, shape (N, TARGET_SUM + 1)
+    size_counts: np.ndarray
+    # 적어도 하나의 수에 포함되는 칸, shape (N, rows, cols)
+    playable: np.ndarray
+
+
+def random_boards(count: int, rows: int, cols: int, seed: int | None = None) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(MIN_VALUE, MAX_VALUE + 1, size=(count, rows, cols), dtype=np.uint8)
+
+
+def boards_to_array(boards: Iterable[Board]) -> np.ndarray:
+    boards = list(boards)
+    if not boards:
+        raise ValueError("no boards given")
+    rows, cols = boards[0].rows, boards[0].cols
+    data = b"".join(bytes(board.values) for board in boards)
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(boards), rows, cols).copy()
+
+
+def _prefix(values: np.ndarray, dtype: type) -> np.ndarray:
+    n, rows, cols = values.shape
+    prefix = np.zeros((n, rows + 1, cols + 1), dtype=dtype)
+    np.cumsum(values, axis=1, dtype=dtype, out=prefix[:, 1:, 1:])
+    np.cumsum(prefix[:, 1:, 1:], axis=2, dtype=dtype, out=prefix[:, 1:, 1:])
+    return prefix
+
+
+def _window_sums(prefix: np.ndarray, h: int, w: int) -> np.ndarray:
+    return prefix[:, h:, w:] - prefix[:, :-h, w:] - prefix[:, h:, :-w] + prefix[:, :-h, :-w]
+
+
+def analyse_boards(boards: np.ndarray) -> BatchAnalysis:
+    """(N, rows, cols) 보드 묶음을 한 번에 분석한다. 0은 빈 칸이다.
+
+    모양(h, w)마다 모든 위치의 사각형 합을 벡터 연산으로 구한다. 값이 음수가 아니므로
+    어떤 모양에서 모든 보드의 모든 합이 10을 넘으면 더 큰 모양은 건너뛴다.
+    """
+    boards = np.asarray(boards)
+    if boards.ndim != 3:
+        raise ValueError(f"expected (N, rows, cols) array, got shape {boards.shape}")
+    n, rows, cols = boards.shape
+    dtype = np.int16 if MAX_VALUE * rows * cols < np.iinfo(np.int16).max else np.int32
+
+    live = boards != 0
+    sums = _prefix(boards, dtype)
+    sparse = not live.all()
+    if sparse:
+        apples = _prefix(live, dtype)
+        # 변마다 사과가 있는지 보려고 행/열 방향 누적합도 둔다.
+        row_live = np.zeros((n, rows, cols + 1), dtype=dtype)
+        np.cumsum(live, axis=2, dtype=dtype, out=row_live[:, :, 1:])
+        col_live = np.zeros((n, rows + 1, cols), dtype=dtype)
+        np.cumsum(live, axis=1, dtype=dtype, out=col_live[:, 1:, :])
+
+    counts = np.zeros(n, dtype=np.int64)
+    size_counts = np.zeros((n, TARGET_SUM + 1), dtype=np.int64)
+    cover = np.zeros((n, rows + 1, cols + 1), dtype=np.int32)
+
+    for h in range(1, rows + 1):
+        for w in range(1, cols + 1):
+            window = _window_sums(sums, h, w)
+            if (window > TARGET_SUM).all():
+                break
+            valid = window == TARGET_SUM
+            if sparse:
+                ph, pw = rows - h + 1, cols - w + 1
+                valid &= (row_live[:, :ph, w:] - row_live[:, :ph, :pw]) > 0
+                valid &= (row_live[:, h - 1 :, w:] - row_live[:, h - 1 :, :pw]) > 0
+                valid &= (col_live[:, h:, :pw] - col_live[:, :ph, :pw]) > 0
+                valid &= (col_live[:, h:, w - 1 :] - col_live[:, :ph, w - 1 :]) > 0
+            found = valid.sum(axis=(1, 2))
+            if not found.any():
+                continue
+            counts += found
+            if sparse:
+                board_ids = np.nonzero(valid)[0]
+                sizes = _window_sums(apples, h, w)[valid]
+                size_counts += np.bincount(
+                    board_ids * (TARGET_SUM + 1) + sizes, minlength=n * (TARGET_SUM + 1)
+                ).reshape(n, TARGET_SUM + 1)
+            else:
+                size_counts[:, h * w] += found
+            # 차분 배열에 사각형을 더해 두고 마지막에 누적합으로 덮인 칸을 구한다.
+            mark = valid.astype(np.int32)
+            cover[:, : rows - h + 1, : cols - w + 1] += mark
+            cover[:, : rows - h + 1, w:] -= mark
+            cover[:, h:, : cols - w + 1] -= mark
+            cover[:, h:, w:] += mark
+        else:
+            continue
+        if w == 1:
+            break
+
+    playable = cover.cumsum(axis=1).cumsum(axis=2)[:, :rows, :cols] > 0
+    return BatchAnalysis(counts=counts, dead=counts == 0, size_counts=size_counts, playable=playable)
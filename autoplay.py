@@ -0,0 +1,194 @@
+﻿import argparse
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from engine import CLEAR_POINTS, Board, MoveIndex, Rect
+
+
+@dataclass
+class SearchConfig:
+    # 수 하나를 고르는 데 쓰는 시간(초). None이면 rollouts_per_move만 본다.
+    time_per_move: float | None = 0.2
+    # 수 하나당 롤아웃 수 상한. None이면 시간 예산만 본다.
+    rollouts_per_move: int | None = None
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    exploration: float = 1.4
+    seed: int | None = None
+
+
+@dataclass
+class PlayResult:
+    score: int
+    clears: int
+    remaining: int
+    moves: list[Rect]
+    rollouts: int
+    elapsed: float
+
+    @property
+    def rollouts_per_sec(self) -> float:
+        return self.rollouts / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def rollout(board: Board, rng: random.Random) -> int:
+    """무작위로 끝까지 둬 보고 지운 횟수를 돌려준다. board는 바뀐다."""
+    index = MoveIndex(board)
+    clears = 0
+    while index:
+        index.apply_move(rng.choice(tuple(index.moves)))
+        clears += 1
+    return clears
+
+
+def _rollout_batch(
+    rows: int,
+    cols: int,
+    values: bytes,
+    candidates: list[Rect],
+    seed: int,
+    seconds: float | None,
+    max_rollouts: int | None,
+    exploration: float,
+) -> tuple[list[int], list[int]]:
+    # 워커 안에서 후보별로 UCB1을 돌린다(깊이 1의 MCTS).
+    rng = random.Random(seed)
+    root = Board(rows, cols, values)
+    totals = [0] * len(candidates)
+    counts = [0] * len(candidates)
+    deadline = None if seconds is None else time.monotonic() + seconds
+    done = 0
+    while True:
+        if max_rollouts is not None and done >= max_rollouts:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if done < len(candidates):
+            pick = done
+        else:
+            log_n = math.log(done)
+            pick = max(
+                range(len(candidates)),
+                key=lambda k: totals[k] / counts[k] + exploration * math.sqrt(log_n / counts[k]),
+            )
+        board = root.copy()
+        board.apply_move(candidates[pick])
+        totals[pick] += 1 + rollout(board, rng)
+        counts[pick] += 1
+        done += 1
+    return totals, counts
+
+
+class AutoPlayer:
+    def __init__(self, config: SearchConfig | None = None, executor: Executor | None = None) -> None:
+        self.config = config or SearchConfig()
+        if self.config.time_per_move is None and self.config.rollouts_per_move is None:
+            raise ValueError("either time_per_move or rollouts_per_move must be set")
+        self.rng = random.Random(self.config.seed)
+        self._own_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers=self.config.workers)
+        self.rollouts = 0
+
+    def __enter__(self) -> "AutoPlayer":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._own_executor:
+            self.executor.shutdown()
+
+    def choose(self, board: Board) -> Rect | None:
+        candidates = sorted(board.find_moves())
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+
+        cfg = self.config
+        workers = max(1, cfg.workers)
+        per_worker = None
+        if cfg.rollouts_per_move is not None:
+            per_worker = max(1, math.ceil(cfg.rollouts_per_move / workers))
+        values = bytes(board.values)
+        futures = [
+            self.executor.submit(
+                _rollout_batch,
+                board.rows,
+                board.cols,
+                values,
+                candidates,
+                self.rng.getrandbits(64),
+                cfg.time_per_move,
+                per_worker,
+                cfg.exploration,
+            )
+            for _ in range(workers)
+        ]
+        totals = [0] * len(candidates)
+        counts = [0] * len(candidates)
+        for future in futures:
+            part_totals, part_counts = future.result()
+            for k in range(len(candidates)):
+                totals[k] += part_totals[k]
+                counts[k] += part_counts[k]
+        self.rollouts += sum(counts)
+        best = max(range(len(candidates)), key=lambda k: (totals[k] / counts[k] if counts[k] else 0.0, counts[k]))
+        return candidates[best]
+
+    def play(self, board: Board) -> PlayResult:
+        board = board.copy()
+        start = time.perf_counter()
+        start_rollouts = self.rollouts
+        moves: list[Rect] = []
+        while True:
+            move = self.choose(board)
+            if move is None:
+                break
+            board.apply_move(move)
+            moves.append(move)
+        return PlayResult(
+            score=len(moves) * CLEAR_POINTS,
+            clears=len(moves),
+            remaining=board.live,
+            moves=moves,
+            rollouts=self.rollouts - start_rollouts,
+            elapsed=time.perf_counter() - start,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="탐색 기반 자동 플레이로 기준 점수를 잰다.")
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--cols", type=int, default=17)
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--time", type=float, default=0.2, help="수 하나당 탐색 시간(초)")
+    parser.add_argument("--rollouts", type=int, default=None, help="수 하나당 롤아웃 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = SearchConfig(
+        time_per_move=None if args.rollouts is not None else args.time,
+        rollouts_per_move=args.rollouts,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    board_rng = random.Random(args.seed)
+    scores: list[int] = []
+    with AutoPlayer(config) as player:
+        for game in range(1, args.games + 1):
+            result = player.play(Board.random(args.rows, args.cols, board_rng))
+            scores.append(result.score)
+            print(
+                f"game {game}: score {result.score}, remaining {result.remaining}, "
+                f"{result.rollouts_per_sec:,.0f} rollouts/s"
+            )
+    print(f"par {statistics.median(scores)} (min {min(scores)}, max {max(scores)})")
+
+
+if __name__ == "__main__":
+    main()
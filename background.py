@@ -0,0 +1,82 @@
+﻿import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+
+# 배경 그림 형식이 바뀌면 올려서 예전 캐시를 쓰지 않게 한다.
+CACHE_VERSION = 1
+
+# (x1, y1, x2, y2, fill, outline, width) - Tk create_rectangle과 같은 뜻
+RectSpec = tuple[int, int, int, int, str, str, int]
+
+
+def _rgb(color: str) -> bytes:
+    return bytes.fromhex(color.lstrip("#"))
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def render_png(width: int, height: int, row_colors: list[str], rects: list[RectSpec]) -> bytes:
+    """세로 그라데이션 위에 사각형들을 순서대로 칠한 RGB PNG를 만든다."""
+    pixels = [bytearray(_rgb(row_colors[y]) * width) for y in range(height)]
+
+    def fill(x1: int, y1: int, x2: int, y2: int, color: bytes) -> None:
+        x1, x2 = max(0, x1), min(width, x2)
+        y1, y2 = max(0, y1), min(height, y2)
+        if x1 >= x2 or y1 >= y2:
+            return
+        span = color * (x2 - x1)
+        for y in range(y1, y2):
+            pixels[y][x1 * 3 : x2 * 3] = span
+
+    for x1, y1, x2, y2, fill_color, outline, line_width in rects:
+        if fill_color:
+            fill(x1, y1, x2, y2, _rgb(fill_color))
+        if outline and line_width > 0:
+            # Tk처럼 테두리 두께의 가운데가 사각형 경계에 오도록 그린다.
+            color = _rgb(outline)
+            lo = line_width // 2
+            hi = line_width - lo
+            fill(x1 - lo, y1 - lo, x2 + hi, y1 + hi, color)
+            fill(x1 - lo, y2 - lo, x2 + hi, y2 + hi, color)
+            fill(x1 - lo, y1 - lo, x1 + hi, y2 + hi, color)
+            fill(x2 - lo, y1 - lo, x2 + hi, y2 + hi, color)
+
+    raw = b"".join(b"\x00" + bytes(row) for row in pixels)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(raw, 6))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def cache_key(width: int, height: int, row_colors: list[str], rects: list[RectSpec]) -> str:
+    text = repr((CACHE_VERSION, width, height, row_colors, rects))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def load_background(cache_dir: Path, width: int, height: int, row_colors: list[str], rects: list[RectSpec]) -> Path | bytes:
+    """캐시된 배경 PNG 경로를 돌려준다. 캐시 폴더를 쓸 수 없으면 PNG 바이트를 돌려준다."""
+    path = cache_dir / f"background-{cache_key(width, height, row_colors, rects)}.png"
+    if path.exists():
+        return path
+    data = render_png(width, height, row_colors, rects)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        return data
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except OSError:
+        Path(tmp_name).unlink(missing_ok=True)
+        return data
+    return path
@@ -0,0 +1,295 @@
+﻿import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+# 벤치마크 케이스: (이름, 준비 함수). 준비 함수는 게임을 받아 한 번 측정할 함수를 돌려주고,
+# 측정 함수는 그 안에서 실행한 호출 횟수를 돌려준다.
+Case = tuple[str, Callable[[Any], Callable[[], int]]]
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    rows, _, cols = text.lower().partition("x")
+    return int(rows), int(cols)
+
+
+def select_backend(name: str) -> str:
+    if name == "fake":
+        import fake_tk
+
+        fake_tk.install()
+        return "fake"
+    import tkinter as tk
+
+    try:
+        probe = tk.Tk()
+        probe.destroy()
+        return "tk"
+    except tk.TclError:
+        if name == "tk":
+            raise
+    import fake_tk
+
+    fake_tk.install()
+    return "fake"
+
+
+def bench_make_cell(game: Any) -> Callable[[], int]:
+    cells = [(r, c) for r in range(game.view_rows) for c in range(game.view_cols)][:200]
+
+    def run() -> int:
+        made = [game.make_cell(r, c, 5) for r, c in cells]
+        for cell in made:
+            for item_id in cell.item_ids:
+                game.canvas.delete(item_id)
+        return len(made)
+
+    return run
+
+
+def bench_reset_game(game: Any) -> Callable[[], int]:
+    def run() -> int:
+        game.reset_game()
+        return 1
+
+    return run
+
+
+def bench_toggle_light_mode(game: Any) -> Callable[[], int]:
+    def run() -> int:
+        game.light_var.set(not game.light_var.get())
+        game.toggle_light_mode()
+        return 1
+
+    return run
+
+
+def bench_show_selection_box(game: Any) -> Callable[[], int]:
+    steps = max(game.rows, game.cols)
+    path = [(min(game.rows - 1, k * game.rows // steps), min(game.cols - 1, k * game.cols // steps)) for k in range(steps)]
+
+    def run() -> int:
+        game.drag_start = (0, 0)
+        for cell in path:
+            game.drag_current = cell
+            game.show_selection_box()
+        game.drag_start = None
+        game.drag_current = None
+        game.show_selection_box()
+        return len(path) + 1
+
+    return run
+
+
+def bench_has_possible_ten(game: Any) -> Callable[[], int]:
+    def run() -> int:
+        game.has_possible_ten()
+        return 1
+
+    return run
+
+
+def bench_board_scan(game: Any) -> Callable[[], int]:
+    # 수를 다 둔 보드는 끝까지 훑어야 하므로 전체 검사의 최악 경우에 가깝다.
+    from engine import MoveIndex
+
+    board = game.board.copy()
+    index = MoveIndex(board)
+    rng = random.Random(0)
+    while index:
+        index.apply_move(rng.choice(tuple(index.moves)))
+
+    def run() -> int:
+        board.has_possible_ten()
+        return 1
+
+    return run
+
+
+def _prepare_rankings(game: Any, entries: int = 1000) -> None:
+    from rankings import RankingStore
+
+    # 케이스마다 같은 크기의 랭킹에서 재도록 임시 폴더의 DB를 새로 만든다.
+    if game.rank_store is not None:
+        game.rank_store.close()
+    game.rank_db_path.unlink(missing_ok=True)
+    game.rank_store = RankingStore(game.rank_db_path)
+    for i in range(entries):
+        game.rank_store.add(f"Player{i}", (i * 37) % 1000, "2026-01-01 00:00:00")
+
+
+def bench_load_rankings(game: Any) -> Callable[[], int]:
+    _prepare_rankings(game)
+
+    def run() -> int:
+        game.load_rankings()
+        return 1
+
+    return run
+
+
+def bench_save_rankings(game: Any) -> Callable[[], int]:
+    _prepare_rankings(game)
+
+    def run() -> int:
+        game.rank_store.add("Bench", 500, "2026-01-01 00:00:00")
+        return 1
+
+    return run
+
+
+def bench_refresh_rank_panel(game: Any) -> Callable[[], int]:
+    _prepare_rankings(game)
+
+    def run() -> int:
+        game.rank_store.add("Bench", 999, "2026-01-01 00:00:00")
+        game.refresh_rank_panel()
+        return 1
+
+    return run
+
+
+CASES: list[Case] = [
+    ("make_cell", bench_make_cell),
+    ("reset_game", bench_reset_game),
+    ("toggle_light_mode", bench_toggle_light_mode),
+    ("show_selection_box", bench_show_selection_box),
+    ("has_possible_ten", bench_has_possible_ten),
+    ("board_scan", bench_board_scan),
+    ("load_rankings", bench_load_rankings),
+    ("save_rankings", bench_save_rankings),
+    ("refresh_rank_panel", bench_refresh_rank_panel),
+]
+
+
+def measure(run: Callable[[], int], repeat: int, flush: Callable[[], None]) -> dict[str, float]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calls = run()
+        flush()
+        samples.append((time.perf_counter() - start) / max(1, calls))
+    samples.sort()
+    return {
+        "min": samples[0],
+        "median": statistics.median(samples),
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "repeat": repeat,
+    }
+
+
+def flush_frame(game: Any, root: Any) -> None:
+    # 캔버스 갱신은 프레임 루프가 모아서 보내므로 측정 끝에 바로 내보낸다.
+    game.renderer.flush()
+    root.update()
+
+
+def run_suite(
+    sizes: list[tuple[int, int]], repeat: int, only: set[str] | None, data_dir: Path
+) -> dict[str, dict[str, float]]:
+    import main
+    import tkinter as tk
+
+    results: dict[str, dict[str, float]] = {}
+    for rows, cols in sizes:
+        root = tk.Tk()
+        game = main.AppleBoxGame(root, rows=rows, cols=cols, data_dir=data_dir)
+        try:
+            game.start_game()
+            for name, prepare in CASES:
+                if only and name not in only:
+                    continue
+                run = prepare(game)
+                result = measure(run, repeat, lambda: flush_frame(game, root))
+                result["items"] = len(game.canvas.find_all())
+                results[f"{name}@{rows}x{cols}"] = result
+                print(f"{name:>20} {rows:>4}x{cols:<4} median {result['median'] * 1000:9.3f} ms", flush=True)
+        finally:
+            # 타이머, 수 찾기 스레드, 랭킹 DB를 모두 닫고 창을 없앤다.
+            game.on_close()
+    return results
+
+
+def compare(
+    current: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+    min_delta: float,
+) -> list[str]:
+    regressions: list[str] = []
+    for key, result in current.items():
+        base = baseline.get(key)
+        if base is None or base["median"] <= 0:
+            continue
+        ratio = result["median"] / base["median"]
+        mark = ""
+        # 마이크로초 단위 케이스는 잡음이 커서 절대 차이도 함께 본다.
+        if ratio > 1 + threshold and result["median"] - base["median"] > min_delta:
+            mark = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:>32} {ratio:7.2f}x{mark}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AppleBoxGame 주요 경로 벤치마크")
+    parser.add_argument("--sizes", default="10x17,30x50", help="쉼표로 구분한 보드 크기, 예: 10x17,100x100")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", choices=("auto", "tk", "fake"), default="auto")
+    parser.add_argument("--only", default="", help="쉼표로 구분한 케이스 이름")
+    parser.add_argument("--output", type=Path, default=None, help="결과를 저장할 JSON 경로")
+    parser.add_argument("--baseline", type=Path, default=None, help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용하는 느려짐 비율")
+    parser.add_argument("--min-delta", type=float, default=5e-6, help="무시할 절대 차이(초)")
+    parser.add_argument("--telemetry", action="store_true", help="게임 기록을 켠 채로 잰다")
+    args = parser.parse_args()
+
+    backend = select_backend(args.backend)
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size]
+    only = {name for name in args.only.split(",") if name} or None
+    # 랭킹 DB, 배경 캐시, 기록은 임시 폴더에 두고 끝나면 지운다. 자동 저장은 main()만 켜므로 벤치는 저장 파일을
+    # 건드리지 않는다. 기록은 기본값처럼 끄고, --telemetry일 때만 켠다. 바꾼 환경 변수는 끝나면 되돌린다.
+    saved = os.environ.get("APPLE_TELEMETRY")
+    with tempfile.TemporaryDirectory(prefix="applebench-") as tmp:
+        os.environ["APPLE_TELEMETRY"] = str(Path(tmp) / "telemetry") if args.telemetry else "off"
+        try:
+            results = run_suite(sizes, args.repeat, only, Path(tmp))
+        finally:
+            if saved is None:
+                os.environ.pop("APPLE_TELEMETRY", None)
+            else:
+                os.environ["APPLE_TELEMETRY"] = saved
+
+    report = {
+        "meta": {
+            "backend": backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "telemetry": args.telemetry,
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("backend") != backend:
+            print(f"warning: baseline backend {baseline.get('meta', {}).get('backend')} != {backend}")
+        regressions = compare(results, baseline.get("results", {}), args.threshold, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+﻿import random
+from array import array
+from typing import Iterable, Iterator
+
+TARGET_SUM = 10
+CLEAR_POINTS = 10
+MIN_VALUE = 1
+MAX_VALUE = 9
+
+# (r1, c1, r2, c2), 양 끝 포함
+Rect = tuple[int, int, int, int]
+
+
+def normalize_rect(start: tuple[int, int], end: tuple[int, int]) -> Rect:
+    sr, sc = start
+    er, ec = end
+    r1, r2 = (sr, er) if sr <= er else (er, sr)
+    c1, c2 = (sc, ec) if sc <= ec else (ec, sc)
+    return r1, c1, r2, c2
+
+
+def rects_overlap(a: Rect, b: Rect) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class Board:
+    """Tk 없이 동작하는 사과 보드. 값은 행 우선 bytearray에 담기고 0은 빈 칸이다."""
+
+    __slots__ = ("rows", "cols", "values", "live", "mass")
+
+    def __init__(self, rows: int, cols: int, values: bytes | bytearray | None = None) -> None:
+        self.rows = rows
+        self.cols = cols
+        if values is None:
+            self.values = bytearray(rows * cols)
+        else:
+            if len(values) != rows * cols:
+                raise ValueError(f"expected {rows * cols} values, got {len(values)}")
+            self.values = bytearray(values)
+        self.live = self.rows * self.cols - self.values.count(0)
+        self.mass = sum(self.values)
+
+    @classmethod
+    def random(cls, rows: int, cols: int, rng: random.Random | None = None) -> "Board":
+        randint = (rng or random).randint
+        return cls(rows, cols, bytes(randint(MIN_VALUE, MAX_VALUE) for _ in range(rows * cols)))
+
+    def copy(self) -> "Board":
+        board = Board.__new__(Board)
+        board.rows = self.rows
+        board.cols = self.cols
+        board.values = bytearray(self.values)
+        board.live = self.live
+        board.mass = self.mass
+        return board
+
+    def index(self, r: int, c: int) -> int:
+        return r * self.cols + c
+
+    def value(self, r: int, c: int) -> int:
+        return self.values[r * self.cols + c]
+
+    def select(self, rect: Rect) -> list[int]:
+        r1, c1, r2, c2 = rect
+        values = self.values
+        cells: list[int] = []
+        for r in range(r1, r2 + 1):
+            base = r * self.cols
+            for i in range(base + c1, base + c2 + 1):
+                if values[i]:
+                    cells.append(i)
+        return cells
+
+    def count(self, rect: Rect) -> int:
+        """범위 안에 남은 사과 수"""
+        r1, c1, r2, c2 = rect
+        values = self.values
+        width = c2 - c1 + 1
+        total = 0
+        for r in range(r1, r2 + 1):
+            start = r * self.cols + c1
+            total += width - values[start : start + width].count(0)
+        return total
+
+    def rect_sum(self, rect: Rect) -> int:
+        r1, c1, r2, c2 = rect
+        values = self.values
+        cols = self.cols
+        total = 0
+        for r in range(r1, r2 + 1):
+            base = r * cols
+            total += sum(values[base + c1 : base + c2 + 1])
+        return total
+
+    def is_valid_move(self, rect: Rect) -> bool:
+        return self.rect_sum(rect) == TARGET_SUM
+
+    def remove(self, cells: list[int]) -> None:
+        values = self.values
+        for i in cells:
+            value = values[i]
+            if value:
+                values[i] = 0
+                self.live -= 1
+                self.mass -= value
+
+    def restore(self, cells: list[tuple[int, int]]) -> None:
+        """지웠던 (칸 번호, 값)을 되살린다."""
+        values = self.values
+        for i, value in cells:
+            if not values[i]:
+                values[i] = value
+                self.live += 1
+                self.mass += value
+
+    def apply_move(self, rect: Rect) -> int:
+        """합이 10이면 범위를 비우고 제거한 사과 수를 돌려준다. 아니면 0."""
+        if self.rect_sum(rect) != TARGET_SUM:
+            return 0
+        r1, c1, r2, c2 = rect
+        values = self.values
+        width = c2 - c1 + 1
+        blank = bytes(width)
+        removed = 0
+        for r in range(r1, r2 + 1):
+            start = r * self.cols + c1
+            removed += width - values[start : start + width].count(0)
+            values[start : start + width] = blank
+        self.live -= removed
+        self.mass -= TARGET_SUM
+        return removed
+
+    def has_possible_ten(self) -> bool:
+        if self.mass < TARGET_SUM:
+            return False
+        rows, cols, values = self.rows, self.cols, self.values
+        for r1 in range(rows):
+            col_sums = [0] * cols
+            for r2 in range(r1, rows):
+                base = r2 * cols
+                for c in range(cols):
+                    col_sums[c] += values[base + c]
+                # 값이 음수가 아니므로 열 합에 대해 슬라이딩 윈도우로 충분하다.
+                lo = 0
+                total = 0
+                for hi in range(cols):
+                    total += col_sums[hi]
+                    while total > TARGET_SUM:
+                        total -= col_sums[lo]
+                        lo += 1
+                    if total == TARGET_SUM:
+                        return True
+                if min(col_sums) > TARGET_SUM:
+                    break
+        return False
+
+    def is_game_over(self) -> bool:
+        return not self.has_possible_ten()
+
+    def find_moves(self, touching: Rect | None = None) -> Iterator[Rect]:
+        """가능한 수를 빈 칸 없이 딱 맞는 사각형으로 하나씩 돌려준다.
+
+        같은 사과 묶음을 지우는 사각형은 여러 개일 수 있으므로, 경계 네 변에 모두
+        사과가 있는 사각형만 센다. ``touching``을 주면 그 범위와 겹치는 수만 찾는다.
+        """
+        rows, cols, values = self.rows, self.cols, self.values
+        if touching is None:
+            touching = (0, 0, rows - 1, cols - 1)
+        tr1, tc1, tr2, tc2 = touching
+        for r1 in range(tr2 + 1):
+            top = r1 * cols
+            if not any(values[top : top + cols]):
+                continue
+            col_sums = [0] * cols
+            for r2 in range(r1, rows):
+                base = r2 * cols
+                for c in range(cols):
+                    col_sums[c] += values[base + c]
+                if min(col_sums[tc1 : tc2 + 1]) > TARGET_SUM:
+                    break
+                if r2 < tr1 or not any(values[base : base + cols]):
+                    continue
+                for c1 in range(tc2 + 1):
+                    if not col_sums[c1]:
+                        continue
+                    total = 0
+                    for c2 in range(c1, cols):
+                        total += col_sums[c2]
+                        if total > TARGET_SUM:
+                            break
+                        if (
+                            total == TARGET_SUM
+                            and c2 >= tc1
+                            and col_sums[c2]
+                            and any(values[top + c1 : top + c2 + 1])
+                            and any(values[base + c1 : base + c2 + 1])
+                        ):
+                            yield r1, c1, r2, c2
+
+
+class Game:
+    __slots__ = ("board", "score", "moves", "clears")
+
+    def __init__(self, board: Board) -> None:
+        self.board = board
+        self.score = 0
+        self.moves = 0
+        self.clears = 0
+
+    def play(self, rect: Rect) -> int | None:
+        """선택 범위의 합을 돌려준다. 사과가 하나도 없으면 수로 치지 않고 None."""
+        board = self.board
+        total = board.rect_sum(rect)
+        if total == 0:
+            return None
+        self.moves += 1
+        if total == TARGET_SUM:
+            board.apply_move(rect)
+            self.score += CLEAR_POINTS
+            self.clears += 1
+        return total
+
+    def is_over(self) -> bool:
+        return self.board.is_game_over()
+
+
+def bounding_rect(cells: list[int], cols: int) -> Rect:
+    rows_ = [i // cols for i in cells]
+    cols_ = [i % cols for i in cells]
+    return min(rows_), min(cols_), max(rows_), max(cols_)
+
+
+class MoveIndex:
+    """현재 보드에서 가능한 수(딱 맞는 10 사각형)를 유지한다.
+
+    사과가 지워지면 그 범위와 겹치는 사각형만 다시 검사하므로 매번 전체를 훑지 않는다. 수는 윗변
+    행별로도 묶어 두어, 낡은 수를 뺄 때 바뀐 범위에 닿을 수 있는 행만 본다.
+    남은 수가 있는지, 몇 개인지는 O(1)로 답한다.
+    """
+
+    __slots__ = ("board", "moves", "by_row", "tallest")
+
+    def __init__(self, board: Board) -> None:
+        self.board = board
+        self.moves: set[Rect] = set()
+        self.by_row: dict[int, set[Rect]] = {}
+        # 지금까지 넣은 수 가운데 가장 큰 높이. 줄지 않는 상한이다.
+        self.tallest = 0
+        self.merge(board.find_moves())
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def __bool__(self) -> bool:
+        return bool(self.moves)
+
+    def __contains__(self, rect: Rect) -> bool:
+        return rect in self.moves
+
+    def __iter__(self) -> Iterator[Rect]:
+        return iter(self.moves)
+
+    def rebuild(self) -> None:
+        self.moves = set()
+        self.by_row = {}
+        self.tallest = 0
+        self.merge(self.board.find_moves())
+
+    def remove(self, cells: list[int], rescan: bool = True) -> Rect | None:
+        """사과를 지우고 바뀐 범위를 돌려준다. rescan이 False면 낡은 수만 빼고 새 수는 merge로 받는다."""
+        cells = [i for i in cells if self.board.values[i]]
+        if not cells:
+            return None
+        self.board.remove(cells)
+        changed = bounding_rect(cells, self.board.cols)
+        if rescan:
+            self.refresh(changed)
+        else:
+            self.invalidate(changed)
+        return changed
+
+    def restore(self, cells: list[tuple[int, int]], rescan: bool = True) -> Rect | None:
+        if not cells:
+            return None
+        self.board.restore(cells)
+        changed = bounding_rect([i for i, _ in cells], self.board.cols)
+        if rescan:
+            self.refresh(changed)
+        else:
+            self.invalidate(changed)
+        return changed
+
+    def apply_move(self, rect: Rect) -> int:
+        removed = self.board.apply_move(rect)
+        if removed:
+            self.refresh(rect)
+        return removed
+
+    def refresh(self, changed: Rect) -> None:
+        self.invalidate(changed)
+        self.merge(self.board.find_moves(changed))
+
+    def invalidate(self, changed: Rect) -> None:
+        cr1, cc1, cr2, cc2 = changed
+        by_row = self.by_row
+        for r in range(max(0, cr1 - self.tallest + 1), cr2 + 1):
+            bucket = by_row.get(r)
+            if not bucket:
+                continue
+            stale = [m for m in bucket if m[2] >= cr1 and m[1] <= cc2 and m[3] >= cc1]
+            if stale:
+                bucket.difference_update(stale)
+                self.moves.difference_update(stale)
+
+    def merge(self, found: Iterable[Rect]) -> None:
+        moves, by_row = self.moves, self.by_row
+        for rect in found:
+            if rect in moves:
+                continue
+            moves.add(rect)
+            by_row.setdefault(rect[0], set()).add(rect)
+            height = rect[2] - rect[0] + 1
+            if height > self.tallest:
+                self.tallest = height
+
+
+def scan_moves(rows: int, cols: int, values: bytes, regions: list[Rect]) -> set[Rect]:
+    """보드 사본에서 regions와 겹치는 수를 모두 찾는다. Tk 밖의 작업 스레드에서 돈다."""
+    board = Board(rows, cols, values)
+    found: set[Rect] = set()
+    for region in regions:
+        found.update(board.find_moves(region))
+    return found
+
+
+class History:
+    """되돌리기/다시 하기 기록. 수마다 지운 사과만 남긴다.
+
+    사과 하나를 (칸 번호 << 4 | 값) uint32 하나로 묶으므로 한 판 기록이 수 KB에 그친다. 보드 전체나
+    칸 객체를 복사하지 않고, 되돌릴 때는 이 값을 다시 채우고 다시 할 때는 같은 칸을 지운다.
+    """
+
+    __slots__ = ("done", "undone")
+
+    def __init__(self) -> None:
+        self.done: list[array] = []
+        self.undone: list[array] = []
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(step) * step.itemsize for step in (*self.done, *self.undone))
+
+    def push(self, board: Board, cells: list[int]) -> None:
+        """지우기 직전에 부른다. 새 수를 두면 다시 할 기록은 버린다."""
+        values = board.values
+        self.done.append(array("I", [i << 4 | values[i] for i in cells if values[i]]))
+        self.undone.clear()
+
+    def undo(self) -> list[tuple[int, int]] | None:
+        """되살릴 (칸 번호, 값) 목록. 되돌릴 수가 없으면 None."""
+        if not self.done:
+            return None
+        step = self.done.pop()
+        self.undone.append(step)
+        return [(packed >> 4, packed & 0xF) for packed in step]
+
+    def redo(self) -> list[int] | None:
+        """다시 지울 칸 번호 목록. 다시 할 수가 없으면 None."""
+        if not self.undone:
+            return None
+        step = self.undone.pop()
+        self.done.append(step)
+        return [packed >> 4 for packed in step]
+
+
+class RectSums:
+    """보드 값 위의 2차원 펜윅 트리. 칸 갱신과 사각형 합 질의가 모두 O(log R * log C)."""
+
+    __slots__ = ("rows", "cols", "tree")
+
+    def __init__(self, board: Board) -> None:
+        self.rows = board.rows
+        self.cols = board.cols
+        width = self.cols + 1
+        tree = [0] * ((self.rows + 1) * width)
+        values = board.values
+        for r in range(self.rows):
+            base = (r + 1) * width
+            tree[base + 1 : base + width] = values[r * self.cols : (r + 1) * self.cols]
+        # 각 노드를 부모에게 한 번씩 더하는 O(RC) 구성
+        for r in range(1, self.rows + 1):
+            for c in range(1, self.cols + 1):
+                parent_c = c + (c & -c)
+                if parent_c <= self.cols:
+                    tree[r * width + parent_c] += tree[r * width + c]
+        for r in range(1, self.rows + 1):
+            parent_r = r + (r & -r)
+            if parent_r <= self.rows:
+                src = r * width
+                dst = parent_r * width
+                for c in range(1, self.cols + 1):
+                    tree[dst + c] += tree[src + c]
+        self.tree = tree
+
+    def add(self, r: int, c: int, delta: int) -> None:
+        tree, width = self.tree, self.cols + 1
+        i = r + 1
+        while i <= self.rows:
+            j = c + 1
+            base = i * width
+            while j <= self.cols:
+                tree[base + j] += delta
+                j += j & -j
+            i += i & -i
+
+    def prefix(self, r: int, c: int) -> int:
+        """[0, r) x [0, c) 범위의 합"""
+        tree, width = self.tree, self.cols + 1
+        total = 0
+        i = r
+        while i > 0:
+            j = c
+            base = i * width
+            while j > 0:
+                total += tree[base + j]
+                j -= j & -j
+            i -= i & -i
+        return total
+
+    def query(self, rect: Rect) -> int:
+        r1, c1, r2, c2 = rect
+        return self.prefix(r2 + 1, c2 + 1) - self.prefix(r1, c2 + 1) - self.prefix(r2 + 1, c1) + self.prefix(r1, c1)
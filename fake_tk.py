@@ -0,0 +1,388 @@
+﻿import itertools
+import sys
+import types
+from typing import Any, Callable
+
+# 디스플레이 없는 환경(CI, 배치 작업)에서 AppleBoxGame을 돌리기 위한 최소한의 tkinter 대용품.
+# 캔버스 아이템은 dict로만 들고 있고, 호출 횟수를 세어 벤치마크에 쓴다.
+
+
+class Variable:
+    def __init__(self, master: Any = None, value: Any = None) -> None:
+        self.value = value
+
+    def get(self) -> Any:
+        return self.value
+
+    def set(self, value: Any) -> None:
+        self.value = value
+
+
+class Widget:
+    def __init__(self, master: Any = None, **options: Any) -> None:
+        self.master = master
+        self.options = options
+
+    def pack(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def grid(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def config(self, **options: Any) -> None:
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, key: str) -> Any:
+        return self.options.get(key, "")
+
+    def bind(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def unbind(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def winfo_fpixels(self, distance: str | float) -> float:
+        text = str(distance)
+        units = {"p": 96 / 72, "i": 96.0, "c": 96 / 2.54, "m": 96 / 25.4}
+        if text and text[-1] in units:
+            return float(text[:-1]) * units[text[-1]]
+        return float(text)
+
+    def destroy(self) -> None:
+        pass
+
+
+class Treeview(Widget):
+    def __init__(self, master: Any = None, **options: Any) -> None:
+        super().__init__(master, **options)
+        self.rows: dict[str, tuple] = {}
+        self.order: list[str] = []
+        self._ids = itertools.count(1)
+
+    def heading(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def column(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def get_children(self, item: str = "") -> tuple[str, ...]:
+        return tuple(self.order)
+
+    def delete(self, *items: str) -> None:
+        for item in items:
+            self.order.remove(item)
+            del self.rows[item]
+
+    def insert(self, parent: str, index: int | str, iid: str | None = None, values: tuple = ()) -> str:
+        iid = iid or f"I{next(self._ids):03d}"
+        if index == "end":
+            self.order.append(iid)
+        else:
+            self.order.insert(int(index), iid)
+        self.rows[iid] = tuple(values)
+        return iid
+
+    def item(self, iid: str, option: str | None = None, **options: Any) -> Any:
+        if "values" in options:
+            self.rows[iid] = tuple(options["values"])
+        if option == "values":
+            return self.rows[iid]
+        return {"values": self.rows[iid]}
+
+    def move(self, iid: str, parent: str, index: int) -> None:
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def exists(self, iid: str) -> bool:
+        return iid in self.rows
+
+
+class Canvas(Widget):
+    def __init__(self, master: Any = None, **options: Any) -> None:
+        super().__init__(master, **options)
+        self.items: dict[int, dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self.calls = 0
+
+    def _create(self, kind: str, *coords: Any, **options: Any) -> int:
+        self.calls += 1
+        item_id = next(self._ids)
+        tags = options.pop("tags", ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = tuple(coords[0])
+        self.items[item_id] = {"type": kind, "coords": list(coords), "tags": list(tags), **options}
+        return item_id
+
+    def create_line(self, *coords: Any, **options: Any) -> int:
+        return self._create("line", *coords, **options)
+
+    def create_rectangle(self, *coords: Any, **options: Any) -> int:
+        return self._create("rectangle", *coords, **options)
+
+    def create_oval(self, *coords: Any, **options: Any) -> int:
+        return self._create("oval", *coords, **options)
+
+    def create_arc(self, *coords: Any, **options: Any) -> int:
+        return self._create("arc", *coords, **options)
+
+    def create_text(self, *coords: Any, **options: Any) -> int:
+        return self._create("text", *coords, **options)
+
+    def create_image(self, *coords: Any, **options: Any) -> int:
+        return self._create("image", *coords, **options)
+
+    def create_polygon(self, *coords: Any, **options: Any) -> int:
+        return self._create("polygon", *coords, **options)
+
+    def _find(self, tag_or_id: int | str) -> list[int]:
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        if tag_or_id == "all":
+            return list(self.items)
+        if tag_or_id.isdigit():
+            return self._find(int(tag_or_id))
+        return [item_id for item_id, item in self.items.items() if tag_or_id in item["tags"]]
+
+    def find_all(self) -> tuple[int, ...]:
+        return tuple(self.items)
+
+    def find_withtag(self, tag_or_id: int | str) -> tuple[int, ...]:
+        return tuple(self._find(tag_or_id))
+
+    def type(self, tag_or_id: int | str) -> str | None:
+        found = self._find(tag_or_id)
+        return self.items[found[0]]["type"] if found else None
+
+    def delete(self, *tags: int | str) -> None:
+        self.calls += 1
+        for tag in tags:
+            for item_id in self._find(tag):
+                del self.items[item_id]
+
+    def itemconfig(self, tag_or_id: int | str, **options: Any) -> None:
+        self.calls += 1
+        tags = options.pop("tags", None)
+        for item_id in self._find(tag_or_id):
+            self.items[item_id].update(options)
+            if tags is not None:
+                self.items[item_id]["tags"] = [tags] if isinstance(tags, str) else list(tags)
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, tag_or_id: int | str, option: str) -> Any:
+        found = self._find(tag_or_id)
+        return self.items[found[0]].get(option, "") if found else ""
+
+    def coords(self, tag_or_id: int | str, *coords: Any) -> list[float] | None:
+        found = self._find(tag_or_id)
+        if not coords:
+            return list(self.items[found[0]]["coords"]) if found else []
+        self.calls += 1
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = tuple(coords[0])
+        for item_id in found:
+            self.items[item_id]["coords"] = list(coords)
+        return None
+
+    def move(self, tag_or_id: int | str, dx: float, dy: float) -> None:
+        self.calls += 1
+        for item_id in self._find(tag_or_id):
+            item = self.items[item_id]
+            item["coords"] = [v + (dx if k % 2 == 0 else dy) for k, v in enumerate(item["coords"])]
+
+    def addtag_withtag(self, new_tag: str, tag_or_id: int | str) -> None:
+        for item_id in self._find(tag_or_id):
+            if new_tag not in self.items[item_id]["tags"]:
+                self.items[item_id]["tags"].append(new_tag)
+
+    def dtag(self, tag_or_id: int | str, tag_to_delete: str | None = None) -> None:
+        tag_to_delete = tag_to_delete or str(tag_or_id)
+        for item_id in self._find(tag_or_id):
+            tags = self.items[item_id]["tags"]
+            if tag_to_delete in tags:
+                tags.remove(tag_to_delete)
+
+    def gettags(self, tag_or_id: int | str) -> tuple[str, ...]:
+        found = self._find(tag_or_id)
+        return tuple(self.items[found[0]]["tags"]) if found else ()
+
+    def tag_raise(self, *args: Any) -> None:
+        self.calls += 1
+
+    def tag_lower(self, *args: Any) -> None:
+        self.calls += 1
+
+    lift = tag_raise
+    lower = tag_lower
+
+    def tag_bind(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def canvasx(self, x: float) -> float:
+        return x
+
+    def canvasy(self, y: float) -> float:
+        return y
+
+    def winfo_width(self) -> int:
+        return int(self.options.get("width", 0))
+
+    def winfo_height(self) -> int:
+        return int(self.options.get("height", 0))
+
+
+class Interpreter:
+    def __init__(self, root: "Tk | None" = None) -> None:
+        self.root = root
+        self.calls: list[tuple] = []
+
+    def call(self, *args: Any) -> Any:
+        self.calls.append(args)
+        if args == ("after", "info") and self.root is not None:
+            return tuple(self.root.jobs)
+        return ""
+
+    def splitlist(self, value: Any) -> tuple:
+        return tuple(value) if isinstance(value, (list, tuple)) else tuple(str(value).split())
+
+
+class PhotoImage:
+    _ids = itertools.count(1)
+    tk = Interpreter()
+
+    def __init__(self, master: Any = None, name: str | None = None, width: int = 0, height: int = 0, **options: Any) -> None:
+        self.name = name or f"pyimage{next(PhotoImage._ids)}"
+        self._width = width
+        self._height = height
+        self.options = options
+
+    def put(self, data: Any, to: Any = None) -> None:
+        pass
+
+    def write(self, filename: str, format: str | None = None) -> None:
+        with open(filename, "wb") as f:
+            f.write(b"P6\n1 1\n255\n\x00\x00\x00")
+
+    def width(self) -> int:
+        return self._width
+
+    def height(self) -> int:
+        return self._height
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Tk(Widget):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__()
+        self.now = 0.0
+        self.jobs: dict[str, tuple[float, Callable[..., Any], tuple]] = {}
+        self._ids = itertools.count(1)
+        self.tk = Interpreter(self)
+
+    def title(self, *args: Any) -> None:
+        pass
+
+    def resizable(self, *args: Any) -> None:
+        pass
+
+    def protocol(self, *args: Any) -> None:
+        pass
+
+    def bell(self) -> None:
+        pass
+
+    def update(self) -> None:
+        self.advance(0)
+
+    def update_idletasks(self) -> None:
+        self.advance(0)
+
+    def after(self, ms: int, func: Callable[..., Any] | None = None, *args: Any) -> str:
+        job = f"after#{next(self._ids)}"
+        if func is not None:
+            self.jobs[job] = (self.now + ms / 1000, func, args)
+        return job
+
+    def after_idle(self, func: Callable[..., Any], *args: Any) -> str:
+        return self.after(0, func, *args)
+
+    def after_cancel(self, job: str) -> None:
+        self.jobs.pop(job, None)
+
+    def mainloop(self) -> None:
+        pass
+
+    def advance(self, seconds: float) -> None:
+        # 가상 시계를 옮기면서 그 사이에 예약된 after 콜백을 순서대로 실행한다.
+        end = self.now + seconds
+        while True:
+            due = [(when, job) for job, (when, _, _) in self.jobs.items() if when <= end]
+            if not due:
+                break
+            when, job = min(due)
+            self.now = max(self.now, when)
+            _, func, args = self.jobs.pop(job)
+            func(*args)
+        self.now = end
+
+
+def _ask_string(*args: Any, **kwargs: Any) -> str | None:
+    return None
+
+
+def install() -> types.ModuleType:
+    """sys.modules의 tkinter를 대용품으로 바꾼다. main을 import하기 전에 불러야 한다."""
+    tk = types.ModuleType("tkinter")
+    tk.Tk = Tk
+    tk.Toplevel = Widget
+    tk.Frame = Widget
+    tk.Label = Widget
+    tk.Button = Widget
+    tk.Scrollbar = Widget
+    tk.Canvas = Canvas
+    tk.PhotoImage = PhotoImage
+    tk.BooleanVar = Variable
+    tk.StringVar = Variable
+    tk.IntVar = Variable
+    tk.DoubleVar = Variable
+    tk.Event = object
+    tk.TclError = RuntimeError
+    tk.CHORD = "chord"
+
+    ttk = types.ModuleType("tkinter.ttk")
+
+    class Style:
+        def __init__(self, master: Any = None) -> None:
+            pass
+
+        def theme_use(self, *args: Any) -> None:
+            pass
+
+        def configure(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+        def map(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+    ttk.Style = Style
+    ttk.Button = Widget
+    ttk.Checkbutton = Widget
+    ttk.Scrollbar = Widget
+    ttk.Scale = Widget
+    ttk.Treeview = Treeview
+
+    simpledialog = types.ModuleType("tkinter.simpledialog")
+    simpledialog.askstring = _ask_string
+
+    tk.ttk = ttk
+    tk.simpledialog = simpledialog
+    sys.modules["tkinter"] = tk
+    sys.modules["tkinter.ttk"] = ttk
+    sys.modules["tkinter.simpledialog"] = simpledialog
+    return tk
@@ -0,0 +1,131 @@
+import time
+from typing import Any, Callable
+
+Clock = Callable[[], float]
+
+
+class PlayClock:
+    """일시정지한 시간을 빼고 흐른 시간을 잰다. 멈춘 순간까지의 시간을 그대로 이어 간다."""
+
+    def __init__(self, clock: Clock = time.monotonic) -> None:
+        self.clock = clock
+        self.banked = 0.0
+        self.started_at: float | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None
+
+    def start(self) -> None:
+        if self.started_at is None:
+            self.started_at = self.clock()
+
+    def pause(self) -> None:
+        if self.started_at is not None:
+            self.banked += self.clock() - self.started_at
+            self.started_at = None
+
+    def reset(self, elapsed: float = 0.0) -> None:
+        """멈춘 상태로 elapsed초가 흐른 것으로 되돌린다. 이어 하기는 저장한 시간을 넘긴다."""
+        self.banked = elapsed
+        self.started_at = None
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return self.banked
+        return self.banked + self.clock() - self.started_at
+
+
+class FrameLoop:
+    """타이머, 애니메이션, 밀린 화면 갱신을 한 프레임에 모아 돌리는 Tk after 루프.
+
+    예약된 after는 언제나 하나뿐이다. 프레임 시각은 고정된 간격의 격자에 맞추고, 처리가 늦어
+    격자를 지나쳤으면 밀린 프레임을 몰아서 돌리지 않고 건너뛴 수만 센다. 할 일이 없으면 멈췄다가
+    add나 request가 오면 다음 격자 시각에 다시 돈다.
+    """
+
+    def __init__(
+        self,
+        root: Any,
+        frame_ms: int = 16,
+        budget_ms: float | None = None,
+        clock: Clock = time.monotonic,
+        on_frame_end: Callable[[], None] | None = None,
+    ) -> None:
+        self.root = root
+        self.frame = frame_ms / 1000
+        # 한 프레임 처리에 허용하는 시간. 넘으면 overruns를 센다.
+        self.budget = (budget_ms if budget_ms is not None else frame_ms) / 1000
+        self.clock = clock
+        self.on_frame_end = on_frame_end
+        # 매 프레임 부르는 작업. False를 돌려주면 빠진다.
+        self.tasks: dict[str, Callable[[float], bool]] = {}
+        # 다음 프레임에 한 번만 부르는 작업. 같은 이름으로 여러 번 요청해도 한 번만 돈다.
+        self.pending: dict[str, Callable[[], None]] = {}
+        self.job: str | None = None
+        self.in_frame = False
+        self.deadline = clock()
+        self.frames = 0
+        self.dropped = 0
+        self.overruns = 0
+        self.last_work = 0.0
+
+    def add(self, name: str, task: Callable[[float], bool]) -> None:
+        self.tasks[name] = task
+        self.wake()
+
+    def remove(self, name: str) -> None:
+        self.tasks.pop(name, None)
+
+    def request(self, name: str, callback: Callable[[], None]) -> None:
+        self.pending[name] = callback
+        self.wake()
+
+    def cancel(self, name: str) -> None:
+        self.pending.pop(name, None)
+
+    def wake(self) -> None:
+        # 프레임 안에서 온 요청은 프레임 끝에서 다음 예약을 정할 때 함께 본다.
+        if self.job is not None or self.in_frame:
+            return
+        now = self.clock()
+        if self.deadline < now:
+            # 쉬는 동안 지나간 격자는 건너뛴 것으로 치지 않는다.
+            self.deadline = now
+        self.job = self.root.after(max(0, round((self.deadline - now) * 1000)), self.run_frame)
+
+    def stop(self) -> None:
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+        self.tasks.clear()
+        self.pending.clear()
+
+    def run_frame(self) -> None:
+        self.job = None
+        self.in_frame = True
+        now = self.clock()
+        try:
+            for name, task in list(self.tasks.items()):
+                if self.tasks.get(name) is task and not task(now):
+                    self.tasks.pop(name, None)
+            pending, self.pending = self.pending, {}
+            for callback in pending.values():
+                callback()
+            if self.on_frame_end is not None:
+                self.on_frame_end()
+        finally:
+            self.in_frame = False
+
+        end = self.clock()
+        self.frames += 1
+        self.last_work = end - now
+        if self.last_work > self.budget:
+            self.overruns += 1
+        self.deadline += self.frame
+        if self.deadline <= end:
+            missed = int((end - self.deadline) / self.frame) + 1
+            self.dropped += missed
+            self.deadline += missed * self.frame
+        if self.tasks or self.pending:
+            self.job = self.root.after(max(1, round((self.deadline - end) * 1000)), self.run_frame)
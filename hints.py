@@ -0,0 +1,92 @@
+import heapq
+from dataclasses import dataclass
+from typing import Callable
+
+from engine import Board, MoveIndex, Rect
+
+# (엔진, 수) -> 점수. 클수록 먼저 추천한다.
+Scorer = Callable[["HintEngine", Rect], float]
+
+
+@dataclass(frozen=True)
+class Hint:
+    rect: Rect
+    score: float
+
+
+def score_apples(engine: "HintEngine", rect: Rect) -> float:
+    """사과를 많이 지우는 수부터"""
+    return engine.board.count(rect)
+
+
+def score_open(engine: "HintEngine", rect: Rect) -> float:
+    """다른 수와 덜 겹치는, 즉 앞으로 둘 수 있는 수를 덜 없애는 수부터. 같으면 사과를 적게 지우는 쪽."""
+    return -engine.conflicts(rect) - engine.board.count(rect) / 100
+
+
+SCORERS: dict[str, Scorer] = {
+    "apples": score_apples,
+    "open": score_open,
+}
+
+
+class HintEngine:
+    """지금 둘 수 있는 수 가운데 점수가 높은 k개를 고른다.
+
+    후보는 게임이 이미 유지하고 있는 MoveIndex에서 꺼내므로 보드를 다시 훑지 않는다. 겹침 점수는
+    top을 부를 때마다 수들이 덮는 칸 수의 누적합을 O(RC + 수 개수)로 한 번 만들고 수마다 O(1)로 읽는다.
+    """
+
+    def __init__(self, board: Board, index: MoveIndex) -> None:
+        self.board = board
+        self.index = index
+        self._coverage: list[int] | None = None
+
+    def top(self, k: int = 3, scorer: str | Scorer = "open") -> list[Hint]:
+        score = SCORERS[scorer] if isinstance(scorer, str) else scorer
+        self._coverage = None
+        best = heapq.nlargest(k, ((score(self, rect), rect) for rect in self.index))
+        return [Hint(rect, value) for value, rect in best]
+
+    def conflicts(self, rect: Rect) -> int:
+        """rect 안의 칸을 덮는 수들의 겹침 합. rect 자신이 덮는 만큼은 뺀다."""
+        prefix = self._coverage_prefix()
+        width = self.board.cols + 1
+        r1, c1, r2, c2 = rect
+        total = (
+            prefix[(r2 + 1) * width + c2 + 1]
+            - prefix[r1 * width + c2 + 1]
+            - prefix[(r2 + 1) * width + c1]
+            + prefix[r1 * width + c1]
+        )
+        return total - (r2 - r1 + 1) * (c2 - c1 + 1)
+
+    def _coverage_prefix(self) -> list[int]:
+        if self._coverage is not None:
+            return self._coverage
+        rows, cols = self.board.rows, self.board.cols
+        width = cols + 1
+        # 2차원 차분 배열에 수마다 네 점만 찍고, 두 번 누적해 칸별 덮임 수를 만든 뒤 한 번 더 누적한다.
+        diff = [0] * ((rows + 1) * width)
+        for r1, c1, r2, c2 in self.index:
+            diff[r1 * width + c1] += 1
+            diff[r1 * width + c2 + 1] -= 1
+            diff[(r2 + 1) * width + c1] -= 1
+            diff[(r2 + 1) * width + c2 + 1] += 1
+        cover = [0] * ((rows + 1) * width)
+        for r in range(rows):
+            run = 0
+            base = r * width
+            above = base - width
+            for c in range(cols):
+                run += diff[base + c]
+                cover[base + c] = run + (cover[above + c] if r else 0)
+        prefix = [0] * ((rows + 1) * width)
+        for r in range(rows):
+            run = 0
+            base = (r + 1) * width
+            for c in range(cols):
+                run += cover[r * width + c]
+                prefix[base + c + 1] = prefix[base - width + c + 1] + run
+        self._coverage = prefix
+        return prefix
@@ -0,0 +1,91 @@
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable
+
+# 이름별로 최근 몇 번의 호출만 들고 백분위를 낸다.
+WINDOW = 1024
+# 트레이스로 내보낼 이벤트 상한. 넘치면 오래된 것부터 버린다.
+MAX_EVENTS = 200_000
+
+
+class LatencyWindow:
+    """최근 WINDOW번 호출 시간(ms)의 이동 창."""
+
+    def __init__(self, size: int = WINDOW) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.count += 1
+
+    def percentiles(self, *points: float) -> list[float]:
+        if not self.samples:
+            return [0.0 for _ in points]
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(last * p / 100 + 0.5))] for p in points]
+
+
+class Instrumentation:
+    """객체의 메서드를 감싸 호출 시간을 잰다.
+
+    install은 인스턴스 속성으로 감싼 함수를 덮어쓰고 uninstall은 그 속성을 지운다. 꺼 두면 원래
+    메서드가 그대로 불리므로 비용이 없다. 그래서 이벤트 바인딩은 메서드를 직접 넘기지 말고 호출
+    시점에 속성을 찾는 람다로 걸어야 감싼 함수를 탄다.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.windows: dict[str, LatencyWindow] = {}
+        self.events: deque[dict[str, Any]] = deque(maxlen=MAX_EVENTS)
+        self.installed: list[tuple[Any, str]] = []
+        self.t0 = time.perf_counter_ns()
+
+    def install(self, target: Any, names: list[str]) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        for name in names:
+            setattr(target, name, self._timed(name, getattr(target, name)))
+            self.installed.append((target, name))
+
+    def uninstall(self) -> None:
+        for target, name in self.installed:
+            target.__dict__.pop(name, None)
+        self.installed.clear()
+        self.enabled = False
+
+    def _timed(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        window = self.windows.setdefault(name, LatencyWindow())
+        events = self.events
+        t0 = self.t0
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.perf_counter_ns()
+                window.add((end - start) / 1e6)
+                events.append({"name": name, "ph": "X", "ts": (start - t0) / 1000, "dur": (end - start) / 1000})
+
+        return wrapper
+
+    def counter(self, name: str, value: int) -> None:
+        self.events.append({"name": name, "ph": "C", "ts": (time.perf_counter_ns() - self.t0) / 1000, "args": {name: value}})
+
+    def summary(self) -> list[tuple[str, int, float, float, float]]:
+        rows = []
+        for name, window in self.windows.items():
+            if window.count:
+                rows.append((name, window.count, *window.percentiles(50, 95, 99)))
+        return rows
+
+    def export_trace(self, path: Path) -> None:
+        """chrome://tracing이나 Perfetto에서 여는 Trace Event 형식으로 저장한다."""
+        events = [{**event, "pid": 1, "tid": 1} for event in self.events]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
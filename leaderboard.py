@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import base64
+import bisect
+import http.client
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from rankings import RankingStore
+
+# (name, score, time, replay)
+Entry = tuple[str, int, str, bytes | None]
+
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large"}
+
+log = logging.getLogger("leaderboard")
+
+
+class LeaderboardServer:
+    """여러 게임이 함께 쓰는 랭킹 서버.
+
+    상위 top_n개는 메모리에 두고 바로 답한다. 받은 기록은 모아 두었다가 batch_size개가 차거나
+    flush_interval초가 지나면 SQLite에 한 트랜잭션으로 쓴다. SQLite는 전용 스레드 하나에서만 다룬다.
+    """
+
+    def __init__(self, db_path: Path, top_n: int = 100, batch_size: int = 500, flush_interval: float = 0.2) -> None:
+        self.db_path = db_path
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leaderboard-db")
+        self.store: RankingStore | None = None
+        # (-score, 순번, 항목) 정렬 목록. 점수가 같으면 먼저 들어온 기록이 앞선다(RankingStore.top과 같은 순서).
+        self.top: list[tuple[int, int, dict[str, Any]]] = []
+        self.pending: list[Entry] = []
+        self.seq = itertools.count()
+        self.flush_wanted = asyncio.Event()
+        self.flusher: asyncio.Task | None = None
+        self.submitted = 0
+        self.written = 0
+        self.errors = 0
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        loop = asyncio.get_running_loop()
+        self.store = await loop.run_in_executor(self.db, RankingStore, self.db_path)
+        for item in await loop.run_in_executor(self.db, self.store.top, self.top_n):
+            self.top.append((-int(item["score"]), next(self.seq), item))
+        self.flusher = asyncio.create_task(self.flush_loop())
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def close(self) -> None:
+        if self.flusher is not None:
+            self.flusher.cancel()
+        try:
+            await self.flush()
+        except sqlite3.Error:
+            log.exception("could not write %d pending scores", len(self.pending))
+        loop = asyncio.get_running_loop()
+        if self.store is not None:
+            await loop.run_in_executor(self.db, self.store.close)
+        self.db.shutdown()
+
+    def submit(self, entry: Entry) -> None:
+        name, score, time, _ = entry
+        self.pending.append(entry)
+        self.submitted += 1
+        key = (-score, next(self.seq), {"name": name, "score": score, "time": time})
+        if len(self.top) < self.top_n or key < self.top[-1]:
+            bisect.insort(self.top, key)
+            del self.top[self.top_n :]
+        if len(self.pending) >= self.batch_size:
+            self.flush_wanted.set()
+
+    async def flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_wanted.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_wanted.clear()
+            # 쓰기가 실패해도 루프는 계속 돈다. 기록은 pending에 남아 다음 번에 다시 쓴다.
+            try:
+                await self.flush()
+            except sqlite3.Error:
+                log.exception("could not write %d scores, retrying", len(self.pending))
+
+    async def flush(self) -> None:
+        if not self.pending or self.store is None:
+            return
+        batch, self.pending = self.pending, []
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.db, self.store.add_many, batch)
+        except sqlite3.Error:
+            # 쓰지 못한 묶음은 그 사이 들어온 기록보다 앞에 되돌려 둔다.
+            self.pending[:0] = batch
+            self.errors += 1
+            raise
+        self.written += len(batch)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # 연결을 끊지 않고 요청을 이어서 받는 최소한의 HTTP/1.1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, _, rest = lines[0].partition(" ")
+                target = rest.partition(" ")[0]
+                headers = {}
+                for line in lines[1:]:
+                    key, sep, value = line.partition(":")
+                    if sep:
+                        headers[key.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self.respond(writer, 400, {"error": "bad content-length"}, close=True)
+                    await writer.drain()
+                    return
+                if length > MAX_BODY:
+                    self.respond(writer, 413, {"error": "body too large"}, close=True)
+                    await writer.drain()
+                    return
+                body = await reader.readexactly(length) if length else b""
+                status, payload = self.route(method, target, body)
+                close = headers.get("connection", "").lower() == "close"
+                self.respond(writer, status, payload, close)
+                await writer.drain()
+                if close:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            writer.close()
+
+    def route(self, method: str, target: str, body: bytes) -> tuple[int, Any]:
+        path, _, query = target.partition("?")
+        if method == "GET" and path == "/top":
+            params = dict(part.partition("=")[::2] for part in query.split("&") if part)
+            try:
+                limit = max(0, min(self.top_n, int(params.get("limit", 10))))
+            except ValueError:
+                return 400, {"error": "bad limit"}
+            return 200, [item for _, _, item in self.top[:limit]]
+        if method == "POST" and path == "/scores":
+            try:
+                data = json.loads(body)
+                name = str(data.get("name", "Player"))[:20]
+                score = int(data["score"])
+                time = str(data.get("time", ""))
+                replay = base64.b64decode(data["replay"]) if data.get("replay") else None
+            except (ValueError, KeyError, TypeError, AttributeError):
+                return 400, {"error": "bad score"}
+            self.submit((name, score, time, replay))
+            return 200, {"ok": True}
+        return 404, {"error": "not found"}
+
+    @staticmethod
+    def respond(writer: asyncio.StreamWriter, status: int, payload: Any, close: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+
+class LeaderboardClient:
+    """랭킹 서버 클라이언트. 요청은 작업 스레드에서 스레드별로 재사용하는 연결로 보내고 Future를 돌려준다.
+
+    Tk 스레드는 Future를 넘겨받기만 하고 결과는 프레임 루프에서 확인하므로 네트워크를 기다리지 않는다.
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0, workers: int = 2) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="leaderboard")
+        self.local = threading.local()
+
+    def close(self) -> None:
+        """기다리지 않고 닫는다. 보내는 중인 요청은 작업 스레드에서 마저 끝나고 밀린 요청은 취소된다.
+
+        끝났다고 확인하지 못한 점수는 부른 쪽이 따로 저장해야 한다.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, name: str, score: int, time: str, replay: bytes | None = None) -> Future:
+        payload = {"name": name, "score": score, "time": time}
+        if replay is not None:
+            payload["replay"] = base64.b64encode(replay).decode("ascii")
+        return self.executor.submit(self.request, "POST", "/scores", payload)
+
+    def top(self, limit: int = 10) -> Future:
+        return self.executor.submit(self.request, "GET", f"/top?limit={limit}")
+
+    def request(self, method: str, path: str, payload: Any = None) -> Any:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        # 서버가 유휴 연결을 닫았을 수 있으므로 한 번은 새 연결로 다시 보낸다.
+        for attempt in range(2):
+            conn = getattr(self.local, "conn", None)
+            if conn is None:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                self.local.conn = conn
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self.local.conn = None
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise OSError(f"leaderboard returned {response.status}")
+            return json.loads(data)
+        raise OSError("unreachable")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="여러 게임이 함께 쓰는 랭킹 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", type=Path, default=Path("leaderboard.sqlite3"))
+    parser.add_argument("--top", type=int, default=100, help="메모리에 두는 상위 기록 수")
+    args = parser.parse_args()
+
+    async def serve() -> None:
+        server = LeaderboardServer(args.db, top_n=args.top)
+        listener = await server.start(args.host, args.port)
+        print(f"leaderboard on http://{args.host}:{args.port} ({args.db})")
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
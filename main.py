@@ -1,17 +1,71 @@
-﻿import json
+﻿import argparse
+import base64
+import itertools
+import json
+import math
+import os
 import random
+import sqlite3
+import time
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from tkinter import simpledialog
 from tkinter import ttk
+from typing import Callable
+
+from background import RectSpec, load_background
+from engine import TARGET_SUM, Board, History, MoveIndex, Rect, RectSums, normalize_rect, scan_moves
+from frameloop import Clock, FrameLoop, PlayClock
+from hints import HintEngine
+from instrument import Instrumentation
+from leaderboard import LeaderboardClient
+from mixer import Mixer, can_mix, open_sink
+from rankings import RankingStore
+from renderer import Renderer
+from replay import Replay
+from savegame import Autosaver, SaveState, load_save, lock_save
+from sprites import SpriteCache, apple_colors
+from telemetry import ABANDONED, END, HIT, MISS, NO_MOVES, START, TIMEOUT, TelemetryWriter
 
 try:
     import winsound
 except ImportError:
     winsound = None
 
+# 창이 뜨기까지 걸린 시간을 재는 기준점
+PROCESS_START = time.perf_counter()
+
+# 이보다 큰 보드는 이만큼만 화면에 그리고 나머지는 스크롤해서 본다.
+MAX_VIEW_ROWS = 12
+MAX_VIEW_COLS = 20
+# 큰 보드에서 Ctrl+휠로 고를 수 있는 칸 크기
+ZOOM_CELL_SIZES = (20, 26, 34, 44)
+SCROLL_STEP = 3
+# 드래그 중 포인터가 판 가장자리에서 이 픽셀 안에 있으면 AUTOSCROLL_MS마다 한 칸씩 넘긴다.
+AUTOSCROLL_EDGE = 16
+AUTOSCROLL_MS = 80
+# 리플레이에서 선택 상자를 보여 준 뒤 수를 두기까지 기다리는 시간(1배속 기준)
+REPLAY_HOLD_MS = 250
+# 계측 오버레이(F3)를 켜면 시간을 재는 메서드
+INSTRUMENTED = [
+    "on_press",
+    "on_drag",
+    "on_release",
+    "tick_timer",
+    "reset_game",
+    "has_possible_ten",
+    "make_cell",
+    "refresh_rank_panel",
+]
+OVERLAY_REFRESH_MS = 500
+# 선택 상자와 힌트 상자가 함께 쓰는 모양
+SELECTION_OUTLINE = "#0ea5e9"
+SELECTION_WIDTH = 3
+HINT_MS = 1500
+
 
 @dataclass
 class Cell:
@@ -28,10 +82,34 @@ class AudioManager:
         self.fail_path = self.base_dir / "assets" / "fail.wav"
         self.bgm_playing = False
         self.bgm_enabled = True
+        self.mixer = self.open_mixer()
+
+    def open_mixer(self) -> Mixer | None:
+        # APPLE_AUDIO: device(기본), null, wav:<경로>. 믹서를 못 쓰면 예전처럼 winsound/bell로 낸다.
+        if not can_mix():
+            return None
+        sink = open_sink(os.environ.get("APPLE_AUDIO", "device"))
+        if sink is None:
+            return None
+        mixer = Mixer(sink)
+        mixer.load("bgm", self.bgm_path)
+        mixer.load("clear", self.clear_path)
+        mixer.load("fail", self.fail_path)
+        mixer.start()
+        return mixer
+
+    def close(self) -> None:
+        self.stop_bgm()
+        if self.mixer is not None:
+            self.mixer.close()
+            self.mixer = None
 
     def start_bgm(self) -> None:
         if not self.bgm_enabled:
             return
+        if self.mixer is not None:
+            self.bgm_playing = self.mixer.start_loop("bgm")
+            return
         if winsound is None or not self.bgm_path.exists():
             return
         try:
@@ -41,6 +119,10 @@ class AudioManager:
             pass
 
     def stop_bgm(self) -> None:
+        if self.mixer is not None:
+            self.mixer.stop_loop()
+            self.bgm_playing = False
+            return
         if winsound is None:
             return
         try:
@@ -63,6 +145,12 @@ class AudioManager:
         self._play_effect(self.fail_path, "fail")
 
     def _play_effect(self, effect_path: Path, mode: str) -> None:
+        # 믹서는 BGM 위에 효과음을 겹쳐 섞는다.
+        if self.mixer is not None:
+            if not self.mixer.play(mode):
+                self._play_bell(mode)
+            return
+
         # winsound는 동시 믹싱이 안 되므로 BGM 재생 중엔 bell로 대체한다.
         if self.bgm_playing:
             self._play_bell(mode)
@@ -83,14 +171,50 @@ class AudioManager:
 
 
 class AppleBoxGame:
-    def __init__(self, root: tk.Tk) -> None:
+    def __init__(
+        self,
+        root: tk.Tk,
+        rows: int = 10,
+        cols: int = 17,
+        frame_ms: int = 16,
+        frame_budget_ms: float | None = None,
+        clock: Clock = time.monotonic,
+        resume: SaveState | None = None,
+        autosaver: Autosaver | None = None,
+        data_dir: Path | None = None,
+    ) -> None:
+        self.startup_marks: dict[str, float] = {}
+        self.mark_startup("init")
         self.root = root
         self.root.title("사과 박스 게임")
         self.root.resizable(False, False)
         self.root.configure(bg="#0f172a")
 
         self.base_dir = Path(__file__).resolve().parent
-        self.rank_path = self.base_dir / "rankings.json"
+        # 랭킹 파일을 둘 폴더. 벤치마크처럼 실제 기록을 건드리면 안 될 때 바꾼다.
+        self.data_dir = data_dir if data_dir is not None else self.base_dir
+        # 예전 JSON 랭킹은 처음 열 때 SQLite로 옮긴다.
+        self.rank_path = self.data_dir / "rankings.json"
+        self.rank_db_path = self.data_dir / "rankings.sqlite3"
+        self.rank_store = self.open_rank_store()
+        self.rank_rows: list[tuple[int | str, str, int | str]] = []
+        # APPLE_LEADERBOARD=http://host:port 이면 공유 랭킹 서버를 쓰고, 안 되면 로컬 DB로 돌아간다.
+        leaderboard_url = os.environ.get("APPLE_LEADERBOARD")
+        self.leaderboard = LeaderboardClient(leaderboard_url) if leaderboard_url else None
+        # 서버로 보내는 중인 점수. 보내지 못하면 로컬 랭킹에 남긴다.
+        self.sending_scores: dict[Future, tuple[str, int, str, bytes | None]] = {}
+        self.rank_request = 0
+        self.future_ids = itertools.count()
+        # APPLE_TELEMETRY에 폴더를 주면 판마다 수 기록을 남긴다. 주지 않거나 off면 남기지 않는다.
+        telemetry_dir = os.environ.get("APPLE_TELEMETRY", "off")
+        self.telemetry = TelemetryWriter(Path(telemetry_dir)) if telemetry_dir not in ("", "off") else None
+        self.session_logged = False
+        self.initial_moves = 0
+        self.last_move_ms = 0
+        # 진행 중인 판은 수를 둘 때, 일시정지할 때, 창을 닫을 때 저장한다.
+        # 자동 저장은 main()이 저장 파일을 잠근 창에만 넘긴다. 벤치나 다른 창은 남의 저장을 지우지 않는다.
+        self.autosaver = autosaver
+        self.cache_dir = self.data_dir / ".cache"
         self.colors = {
             "window_bg": "#0f172a",
             "panel_bg": "#111827",
@@ -106,13 +230,19 @@ class AppleBoxGame:
         }
         self.setup_styles()
 
-        self.rows = 10
-        self.cols = 17
+        self.rows = rows
+        self.cols = cols
         self.cell_size = 34
         self.time_limit = 120
 
-        self.board_w = self.cols * self.cell_size
-        self.board_h = self.rows * self.cell_size
+        # 캔버스에는 보이는 칸(view_rows x view_cols)만 만들고, 스크롤하면 같은 아이템에 값만 바꿔 넣는다.
+        self.view_rows = min(self.rows, MAX_VIEW_ROWS)
+        self.view_cols = min(self.cols, MAX_VIEW_COLS)
+        self.view_top = 0
+        self.view_left = 0
+
+        self.board_w = self.view_cols * self.cell_size
+        self.board_h = self.view_rows * self.cell_size
 
         self.outer_pad = 16
         self.inner_pad = 18
@@ -140,12 +270,45 @@ class AppleBoxGame:
         self.game_over = False
         self.started = False
         self.paused = False
-        self.timer_job: str | None = None
-
-        self.grid: list[list[Cell | None]] = [[None for _ in range(self.cols)] for _ in range(self.rows)]
+        # 남은 시간은 일시정지를 뺀 단조 시계로 계산하므로 틱이 늦어도 밀리지 않는다.
+        self.play_clock = PlayClock(clock)
+
+        # 지금 판의 기록. 점수를 저장할 때 함께 넣어 나중에 다시 둬 볼 수 있게 한다.
+        self.replay: Replay | None = None
+        self.history = History()
+        # 되돌리기를 쓴 판은 연습으로 보고 랭킹에 남기지 않는다.
+        self.assisted = False
+        self.replaying = False
+        self.replay_source: Replay | None = None
+        self.replay_job: str | None = None
+        self.replay_speed = 1.0
+        self.replay_step = 0
+        self.replay_t = 0
+
+        self.board = Board(self.rows, self.cols)
+        self.move_index = MoveIndex(self.board)
+        self.rect_sums = RectSums(self.board)
+        # 사과를 지운 뒤 새로 생긴 수는 작업 스레드에서 찾는다. 그동안 보드가 또 바뀌면 결과를 버린다.
+        # 스레드는 처음 찾을 때 만들고 on_close에서 닫는다.
+        self.scan_executor: ThreadPoolExecutor | None = None
+        self.scan_future: Future | None = None
+        self.board_version = 0
+        self.dirty_rects: list[Rect] = []
+        # 화면의 칸 자리마다 한 번만 만들어 두고 다시 쓰는 캔버스 아이템 묶음. 빈 칸은 숨기기만 한다.
+        self.grid: list[list[Cell]] = []
+        self.build_job: str | None = None
         self.drag_start: tuple[int, int] | None = None
         self.drag_current: tuple[int, int] | None = None
+        # 드래그 중인 포인터의 캔버스 좌표. 스크롤하면 이 자리의 칸으로 선택 끝을 옮긴다.
+        self.drag_pointer: tuple[int, int] | None = None
+        self.autoscroll_at = 0.0
         self.selection_cell_tag = "selection_cell"
+        # 칸별 강조 사각형은 화면 자리마다 처음 쓸 때 만들고 이후에는 숨기고 보이기만 한다.
+        self.selection_items: dict[int, int] = {}
+        self.selection_rect: tuple[int, int, int, int] | None = None
+        self.frame_ms = frame_ms
+        # 타이머, 선택 상자, 아이템 갱신을 한 프레임에 모아 돌리는 루프
+        self.frame_loop = FrameLoop(self.root, frame_ms, frame_budget_ms, clock)
 
         self.main_area = tk.Frame(root, bg=self.colors["window_bg"])
         self.main_area.pack(padx=8, pady=(8, 0))
@@ -158,6 +321,12 @@ class AppleBoxGame:
             highlightthickness=0,
         )
         self.canvas.pack(side="left")
+        # 아이템 옵션 변경은 모아 두었다가 이벤트 처리가 끝난 뒤 바뀐 것만 한 번에 보낸다.
+        self.renderer = Renderer(self.canvas, lambda flush: self.frame_loop.wake())
+        self.frame_loop.on_frame_end = self.renderer.flush
+        self.font_px = round(self.root.winfo_fpixels("16p"))
+        self.sprite_caches: dict[int, SpriteCache] = {}
+        self.sprites = self.sprite_cache(self.cell_size)
 
         self.rank_frame = tk.Frame(self.main_area, bg=self.colors["panel_bg"], bd=0)
         self.rank_frame.pack(side="left", fill="y", padx=(10, 0), pady=16)
@@ -187,8 +356,24 @@ class AppleBoxGame:
 
         self.draw_static_layout()
         self.create_hud_items()
+        self.mark_startup("layout")
 
-        self.selection_id = self.canvas.create_rectangle(0, 0, 0, 0, outline="#0ea5e9", width=3, state="hidden")
+        self.selection_id = self.canvas.create_rectangle(
+            0, 0, 0, 0, outline=SELECTION_OUTLINE, width=SELECTION_WIDTH, state="hidden"
+        )
+        self.hint_id = self.canvas.create_rectangle(
+            0, 0, 0, 0, outline=SELECTION_OUTLINE, width=SELECTION_WIDTH, state="hidden"
+        )
+        self.hint_job: str | None = None
+        self.selection_sum_bg_id = self.canvas.create_rectangle(0, 0, 0, 0, fill="#0ea5e9", outline="", state="hidden")
+        self.selection_sum_id = self.canvas.create_text(
+            0,
+            0,
+            text="",
+            font=("Segoe UI", 10, "bold"),
+            fill="white",
+            state="hidden",
+        )
         self.pause_overlay_id = self.canvas.create_rectangle(
             self.board_x,
             self.board_y,
@@ -212,8 +397,14 @@ class AppleBoxGame:
         control_frame.pack(fill="x", padx=24, pady=(4, 10))
         self.start_btn = ttk.Button(control_frame, text="Start", command=self.start_game, style="Primary.TButton")
         self.start_btn.pack(side="left", padx=(0, 6))
-        self.reset_btn = ttk.Button(control_frame, text="Reset", command=self.reset_game, style="Secondary.TButton")
+        self.reset_btn = ttk.Button(control_frame, text="Reset", command=lambda: self.reset_game(), style="Secondary.TButton")
         self.reset_btn.pack(side="left")
+        self.hint_btn = ttk.Button(control_frame, text="Hint", command=lambda: self.show_hint(), style="Secondary.TButton")
+        self.hint_btn.pack(side="left", padx=(6, 0))
+        self.undo_btn = ttk.Button(control_frame, text="Undo", command=lambda: self.undo_move(), style="Secondary.TButton")
+        self.undo_btn.pack(side="left", padx=(6, 0))
+        self.redo_btn = ttk.Button(control_frame, text="Redo", command=lambda: self.redo_move(), style="Secondary.TButton")
+        self.redo_btn.pack(side="left", padx=(6, 0))
 
         self.pause_btn = ttk.Button(control_frame, text="일시정지", command=self.toggle_pause, style="Secondary.TButton")
         self.pause_btn.pack(side="left", padx=8)
@@ -266,16 +457,83 @@ class AppleBoxGame:
             state="normal",
         )
 
-        self.canvas.bind("<ButtonPress-1>", self.on_press)
-        self.canvas.bind("<B1-Motion>", self.on_drag)
-        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        # 계측을 켜면 인스턴스 속성이 바뀌므로 핸들러는 호출할 때 찾는다.
+        self.canvas.bind("<ButtonPress-1>", lambda event: self.on_press(event))
+        self.canvas.bind("<B1-Motion>", lambda event: self.on_drag(event))
+        self.canvas.bind("<ButtonRelease-1>", lambda event: self.on_release(event))
         self.root.bind("<space>", self.toggle_pause)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", self.on_wheel)
+        self.canvas.bind("<Button-5>", self.on_wheel)
+        self.root.bind("<Up>", lambda event: self.scroll_view(-1, 0))
+        self.root.bind("<Down>", lambda event: self.scroll_view(1, 0))
+        self.root.bind("<Left>", lambda event: self.scroll_view(0, -1))
+        self.root.bind("<Right>", lambda event: self.scroll_view(0, 1))
+        self.root.bind("<plus>", lambda event: self.zoom_view(1))
+        self.root.bind("<equal>", lambda event: self.zoom_view(1))
+        self.root.bind("<minus>", lambda event: self.zoom_view(-1))
+        self.root.bind("<bracketleft>", lambda event: self.change_replay_speed(0.5))
+        self.root.bind("<bracketright>", lambda event: self.change_replay_speed(2.0))
+        self.root.bind("<F3>", lambda event: self.toggle_instrumentation())
+        self.root.bind("<h>", lambda event: self.show_hint())
+        self.root.bind("<Control-z>", lambda event: self.undo_move())
+        self.root.bind("<Control-y>", lambda event: self.redo_move())
+        self.root.bind("<Control-Z>", lambda event: self.redo_move())
+        self.root.bind("<F4>", lambda event: self.export_trace())
 
         self.audio = AudioManager(self.base_dir, self.root)
 
-        self.reset_game()
+        self.instrumentation = Instrumentation()
+        self.overlay_job: str | None = None
+        self.overlay_bg_id = self.canvas.create_rectangle(0, 0, 0, 0, fill="#0b1220", stipple="gray75", outline="", state="hidden")
+        self.overlay_text_id = self.canvas.create_text(
+            self.board_x + 6,
+            self.board_y + 6,
+            anchor="nw",
+            text="",
+            font=("Consolas", 9),
+            fill="#e5e7eb",
+            state="hidden",
+        )
+        if os.environ.get("APPLE_PROFILE"):
+            self.toggle_instrumentation()
+
+        if resume is not None:
+            self.resume_game(resume)
+        else:
+            self.reset_game()
         self.refresh_rank_panel()
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.canvas.bind("<Map>", self.on_first_map)
+        self.mark_startup("ready")
+
+    def mark_startup(self, name: str) -> None:
+        self.startup_marks[name] = (time.perf_counter() - PROCESS_START) * 1000
+
+    def on_first_map(self, event: tk.Event | None = None) -> None:
+        self.canvas.unbind("<Map>")
+        # 매핑 뒤 첫 idle 때 그리기가 끝나므로 그때를 첫 프레임으로 본다.
+        self.root.after_idle(self.mark_first_frame)
+
+    def mark_first_frame(self) -> None:
+        self.mark_startup("first_frame")
+        self.write_startup_log()
+
+    def write_startup_log(self) -> None:
+        # APPLE_STARTUP_LOG에 경로를 주면 첫 프레임과 사과 생성이 모두 끝났을 때 한 줄씩 남긴다.
+        log_path = os.environ.get("APPLE_STARTUP_LOG")
+        if not log_path or "first_frame" not in self.startup_marks or "cells" not in self.startup_marks:
+            return
+        record = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "board": f"{self.rows}x{self.cols}",
+            "marks_ms": {name: round(value, 2) for name, value in self.startup_marks.items()},
+        }
+        try:
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
 
     def setup_styles(self) -> None:
         style = ttk.Style(self.root)
@@ -330,69 +588,73 @@ class AppleBoxGame:
         style.map("Treeview.Heading", background=[("active", "#15803d")])
 
     def draw_static_layout(self) -> None:
-        for i in range(self.height):
-            ratio = i / max(1, self.height)
-            g = int(20 + ratio * 18)
-            b = int(35 + ratio * 28)
-            color = f"#0f{g:02x}{b:02x}"
-            self.canvas.create_line(0, i, self.width, i, fill=color, tags=("decor",))
-
-        self.canvas.create_rectangle(
-            self.outer_pad + 4,
-            self.outer_pad + 6,
-            self.width - self.outer_pad + 4,
-            self.height - self.outer_pad - 2,
-            fill="#0b1220",
-            outline="",
-            tags=("decor",),
-        )
-        self.canvas.create_rectangle(
-            self.outer_pad,
-            self.outer_pad,
-            self.width - self.outer_pad,
-            self.height - self.outer_pad - 6,
-            fill=self.colors["board_frame"],
-            outline="#15803d",
-            width=3,
-            tags=("decor",),
-        )
-        self.canvas.create_rectangle(
-            self.inner_x,
-            self.inner_y,
-            self.inner_x + self.inner_w,
-            self.inner_y + self.inner_h,
-            fill=self.colors["board_inner"],
-            outline="#dcfce7",
-            width=3,
-            tags=("decor",),
-        )
-
-        for r in range(self.rows):
-            for c in range(self.cols):
+        self.background_image = self.load_background_image()
+        self.background_id = self.canvas.create_image(0, 0, anchor="nw", image=self.background_image, tags=("decor",))
+
+    def load_background_image(self) -> tk.PhotoImage:
+        # 그라데이션과 판 배경은 칸 크기가 바뀔 때만 달라지므로 한 장의 이미지로 그려 디스크에 캐시해 둔다.
+        row_colors = [self.gradient_color(i) for i in range(self.height)]
+        background = load_background(self.cache_dir, self.width, self.height, row_colors, self.static_layout_rects())
+        if isinstance(background, Path):
+            return tk.PhotoImage(master=self.root, file=str(background))
+        return tk.PhotoImage(master=self.root, data=base64.b64encode(background))
+
+    def gradient_color(self, i: int) -> str:
+        ratio = i / max(1, self.height)
+        g = int(20 + ratio * 18)
+        b = int(35 + ratio * 28)
+        return f"#0f{g:02x}{b:02x}"
+
+    def static_layout_rects(self) -> list[RectSpec]:
+        rects: list[RectSpec] = [
+            (
+                self.outer_pad + 4,
+                self.outer_pad + 6,
+                self.width - self.outer_pad + 4,
+                self.height - self.outer_pad - 2,
+                "#0b1220",
+                "",
+                0,
+            ),
+            (
+                self.outer_pad,
+                self.outer_pad,
+                self.width - self.outer_pad,
+                self.height - self.outer_pad - 6,
+                self.colors["board_frame"],
+                "#15803d",
+                3,
+            ),
+            (
+                self.inner_x,
+                self.inner_y,
+                self.inner_x + self.inner_w,
+                self.inner_y + self.inner_h,
+                self.colors["board_inner"],
+                "#dcfce7",
+                3,
+            ),
+        ]
+
+        for r in range(self.view_rows):
+            for c in range(self.view_cols):
                 x = self.board_x + c * self.cell_size
                 y = self.board_y + r * self.cell_size
                 tone = self.colors["board_cell_a"] if (r + c) % 2 == 0 else self.colors["board_cell_b"]
-                self.canvas.create_rectangle(
-                    x,
-                    y,
-                    x + self.cell_size,
-                    y + self.cell_size,
-                    fill=tone,
-                    outline="#d8f7d8",
-                    width=1,
-                    tags=("board_bg",),
-                )
-
-        self.canvas.create_rectangle(
-            self.timer_x,
-            self.timer_y,
-            self.timer_x + self.right_timer_w,
-            self.timer_y + self.timer_h,
-            fill="#ecfdf3",
-            outline="#16a34a",
-            width=2,
-            tags=("decor",),
+                rects.append((x, y, x + self.cell_size, y + self.cell_size, tone, "#d8f7d8", 1))
+
+        rects.append(
+            (
+                self.timer_x,
+                self.timer_y,
+                self.timer_x + self.right_timer_w,
+                self.timer_y + self.timer_h,
+                "#ecfdf3",
+                "#16a34a",
+                2,
+            )
         )
+        return rects
 
     def create_hud_items(self) -> None:
         self.score_id = self.canvas.create_text(
@@ -403,6 +665,22 @@ class AppleBoxGame:
             font=("Segoe UI", 13, "bold"),
             fill="#052e16",
         )
+        self.moves_left_id = self.canvas.create_text(
+            self.board_x + 130,
+            self.board_y - 13,
+            anchor="sw",
+            text="",
+            font=("Segoe UI", 11, "bold"),
+            fill="#065f46",
+        )
+        self.view_pos_id = self.canvas.create_text(
+            self.board_x + self.board_w,
+            self.board_y - 13,
+            anchor="se",
+            text="",
+            font=("Segoe UI", 10, "bold"),
+            fill="#065f46",
+        )
         self.time_text_id = self.canvas.create_text(
             self.timer_x + self.right_timer_w // 2,
             self.timer_y - 10,
@@ -427,39 +705,127 @@ class AppleBoxGame:
         )
 
     def on_close(self) -> None:
+        trace_path = os.environ.get("APPLE_TRACE")
+        if trace_path and self.instrumentation.enabled:
+            self.export_trace(Path(trace_path))
+        self.cancel_overlay_job()
         self.cancel_timer_job()
-        self.audio.stop_bgm()
+        self.autosave()
+        self.hide_hint()
+        self.frame_loop.stop()
+        self.stop_replay()
+        if self.build_job is not None:
+            self.root.after_cancel(self.build_job)
+            self.build_job = None
+        self.audio.close()
+        self.abandon_session()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        if self.autosaver is not None:
+            self.autosaver.close()
+        if self.scan_executor is not None:
+            self.scan_executor.shutdown(wait=False, cancel_futures=True)
+            self.scan_executor = None
+        if self.leaderboard is not None:
+            # 창을 닫느라 보냈다고 확인하지 못한 점수는 기다리지 않고 바로 로컬에도 남긴다.
+            for future, entry in self.sending_scores.items():
+                if not future.done() or future.cancelled() or future.exception() is not None:
+                    self.store_score_locally(entry)
+            self.sending_scores.clear()
+            self.leaderboard.close()
+        if self.rank_store is not None:
+            self.rank_store.close()
         self.root.destroy()
 
+    def toggle_instrumentation(self) -> None:
+        if self.instrumentation.enabled:
+            self.instrumentation.uninstall()
+            self.cancel_overlay_job()
+            self.renderer.itemconfig(self.overlay_bg_id, state="hidden")
+            self.renderer.itemconfig(self.overlay_text_id, state="hidden")
+            return
+        self.instrumentation.install(self, INSTRUMENTED)
+        self.renderer.itemconfig(self.overlay_bg_id, state="normal")
+        self.renderer.itemconfig(self.overlay_text_id, state="normal")
+        self.canvas.tag_raise(self.overlay_bg_id)
+        self.canvas.tag_raise(self.overlay_text_id)
+        self.refresh_overlay()
+
+    def refresh_overlay(self) -> None:
+        self.overlay_job = None
+        # 아이템 수와 after 대기열은 둘 다 Tk 전체를 훑으므로 오버레이를 갱신할 때만 잰다.
+        items = len(self.canvas.find_all())
+        pending = len(self.root.tk.splitlist(self.root.tk.call("after", "info")))
+        self.instrumentation.counter("canvas_items", items)
+        self.instrumentation.counter("after_queue", pending)
+
+        lines = [f"{'handler':<19}{'n':>6}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for name, count, p50, p95, p99 in self.instrumentation.summary():
+            lines.append(f"{name:<19}{count:>6}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}")
+        loop = self.frame_loop
+        lines.append(f"frames {loop.frames}  dropped {loop.dropped}  over budget {loop.overruns}")
+        lines.append(f"items {items}  after {pending}  (ms, F4: trace)")
+        self.renderer.itemconfig(self.overlay_text_id, text="\n".join(lines))
+        self.renderer.coords(
+            self.overlay_bg_id,
+            self.board_x,
+            self.board_y,
+            self.board_x + 12 + 7 * len(lines[0]),
+            self.board_y + 12 + 14 * len(lines),
+        )
+        self.overlay_job = self.root.after(OVERLAY_REFRESH_MS, self.refresh_overlay)
+
+    def cancel_overlay_job(self) -> None:
+        if self.overlay_job is not None:
+            self.root.after_cancel(self.overlay_job)
+            self.overlay_job = None
+
+    def export_trace(self, path: Path | None = None) -> None:
+        if path is None:
+            path = self.base_dir / "traces" / f"trace-{datetime.now():%Y%m%d-%H%M%S}.json"
+        try:
+            self.instrumentation.export_trace(path)
+        except OSError:
+            return
+        self.renderer.itemconfig(self.info_id, text=f"트레이스 저장: {path.name}")
+
     def cancel_timer_job(self) -> None:
-        if self.timer_job is not None:
-            self.root.after_cancel(self.timer_job)
-            self.timer_job = None
+        # 시계를 멈춘 순간까지의 시간은 그대로 남아 재개하면 이어서 흐른다.
+        self.play_clock.pause()
+        self.frame_loop.remove("timer")
 
     def start_timer(self) -> None:
-        self.cancel_timer_job()
-        self.timer_job = self.root.after(1000, self.tick_timer)
+        self.play_clock.start()
+        self.frame_loop.add("timer", lambda now: self.tick_timer())
+
+    def play_elapsed_ms(self) -> int:
+        return int(self.play_clock.elapsed() * 1000)
 
-    def tick_timer(self) -> None:
-        self.timer_job = None
+    def tick_timer(self) -> bool:
+        # 프레임마다 불린다. False를 돌려주면 프레임 루프에서 빠진다.
         if self.game_over or self.paused:
-            return
-        self.time_left = max(0, self.time_left - 1)
-        self.update_timer_ui()
-        if self.time_left == 0:
+            return False
+        remaining = self.time_limit - self.play_clock.elapsed()
+        self.update_timer_ui(remaining)
+        if remaining <= 0:
             self.finish_game("시간 종료")
-            return
-        self.start_timer()
-
-    def update_timer_ui(self) -> None:
-        ratio = self.time_left / self.time_limit if self.time_limit > 0 else 0
+            return False
+        return True
+
+    def update_timer_ui(self, remaining: float | None = None) -> None:
+        # 막대는 남은 시간을 그대로 따라가고, 숫자는 올림한 초를 보인다.
+        if remaining is None:
+            remaining = self.time_limit - self.play_clock.elapsed()
+        remaining = max(0.0, remaining)
+        self.time_left = math.ceil(remaining)
+        ratio = remaining / self.time_limit if self.time_limit > 0 else 0
         fill_h = int((self.timer_h - 6) * ratio)
         y1 = self.timer_y + self.timer_h - 3 - fill_h
         y2 = self.timer_y + self.timer_h - 3
         if fill_h <= 0:
-            self.canvas.coords(self.timer_fill_id, 0, 0, 0, 0)
+            self.renderer.coords(self.timer_fill_id, 0, 0, 0, 0)
         else:
-            self.canvas.coords(
+            self.renderer.coords(
                 self.timer_fill_id,
                 self.timer_x + 3,
                 y1,
@@ -472,54 +838,94 @@ class AppleBoxGame:
             color = "#f2b51d"
         if ratio <= 0.25:
             color = "#f04a2f"
-        self.canvas.itemconfig(self.timer_fill_id, fill=color)
-        self.canvas.itemconfig(self.time_text_id, text=str(self.time_left), fill=color)
+        self.renderer.itemconfig(self.timer_fill_id, fill=color)
+        self.renderer.itemconfig(self.time_text_id, text=str(self.time_left), fill=color)
 
-    def reset_game(self) -> None:
+    def reset_game(self, seed: int | None = None) -> None:
+        self.abandon_session()
+        if self.autosaver is not None:
+            self.autosaver.clear()
         self.cancel_timer_job()
+        self.stop_replay()
+        self.hide_hint()
         self.score = 0
         self.moves = 0
+        self.play_clock.reset()
         self.time_left = self.time_limit
         self.game_over = False
         self.set_paused(False)
 
-        self.canvas.delete("cell")
-        self.canvas.delete(self.selection_cell_tag)
-        self.canvas.itemconfig(self.selection_id, state="hidden")
-
-        self.grid = [[None for _ in range(self.cols)] for _ in range(self.rows)]
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.grid[r][c] = self.make_cell(r, c, random.randint(1, 9))
+        self.hide_selection()
+
+        if seed is None:
+            seed = random.randrange(1 << 63)
+        self.board = Board.random(self.rows, self.cols, random.Random(seed))
+        self.replay = Replay(seed, self.rows, self.cols, self.time_limit)
+        self.history = History()
+        self.assisted = False
+        self.move_index = MoveIndex(self.board)
+        self.rect_sums = RectSums(self.board)
+        self.cancel_move_scan()
+        self.session_logged = False
+        self.initial_moves = len(self.move_index)
+        self.last_move_ms = 0
+        self.sync_cells()
 
         self.update_score_ui()
         self.update_timer_ui()
+        self.update_view_ui()
         if self.started:
-            self.canvas.itemconfig(self.info_id, text="사각형으로 선택한 범위의 합이 10이면 제거")
-            self.canvas.itemconfig(self.start_overlay_id, state="hidden")
-            self.canvas.itemconfig(self.start_text_id, state="hidden")
+            self.renderer.itemconfig(self.info_id, text="사각형으로 선택한 범위의 합이 10이면 제거")
+            self.renderer.itemconfig(self.start_overlay_id, state="hidden")
+            self.renderer.itemconfig(self.start_text_id, state="hidden")
             self.start_timer()
             if self.bgm_var.get():
                 self.audio.start_bgm()
         else:
-            self.canvas.itemconfig(self.info_id, text="초기 화면입니다. Start 버튼을 눌러주세요.")
-            self.canvas.itemconfig(self.start_overlay_id, state="normal")
-            self.canvas.itemconfig(self.start_text_id, state="normal")
+            self.renderer.itemconfig(self.info_id, text="초기 화면입니다. Start 버튼을 눌러주세요.")
+            self.renderer.itemconfig(self.start_overlay_id, state="normal")
+            self.renderer.itemconfig(self.start_text_id, state="normal")
             self.audio.stop_bgm()
 
+    def sync_cells(self) -> None:
+        if not self.grid:
+            if self.started:
+                self.build_cells()
+            elif self.build_job is None:
+                # 첫 화면은 시작 오버레이로 덮여 있으니 사과는 창이 뜬 뒤 한가할 때 만든다.
+                self.build_job = self.root.after_idle(self.build_cells)
+            return
+        for vr, row in enumerate(self.grid):
+            for vc, cell in enumerate(row):
+                self.set_cell_value(cell, self.board.value(self.view_top + vr, self.view_left + vc))
+
+    def build_cells(self) -> None:
+        if self.build_job is not None:
+            self.root.after_cancel(self.build_job)
+            self.build_job = None
+        if self.grid:
+            return
+        for vr in range(self.view_rows):
+            row: list[Cell] = []
+            for vc in range(self.view_cols):
+                value = self.board.value(self.view_top + vr, self.view_left + vc)
+                cell = self.make_cell(vr, vc, value or 1)
+                self.set_cell_value(cell, value)
+                row.append(cell)
+            self.grid.append(row)
+        # 늦게 만들어도 선택 상자와 오버레이 아래에 오게 한다.
+        self.canvas.tag_lower("cell", self.selection_id)
+        self.mark_startup("cells")
+        self.write_startup_log()
+
     def toggle_light_mode(self) -> None:
-        values: list[list[int | None]] = []
-        for r in range(self.rows):
-            row: list[int | None] = []
-            for c in range(self.cols):
-                row.append(None if self.grid[r][c] is None else self.grid[r][c].value)
-            values.append(row)
-
-        self.canvas.delete("cell")
-        for r in range(self.rows):
-            for c in range(self.cols):
-                value = values[r][c]
-                self.grid[r][c] = None if value is None else self.make_cell(r, c, value)
+        # 아이템은 그대로 두고 색만 바꾸므로 선택 상태, 쌓임 순서, Cell.item_ids가 모두 유지된다.
+        light = self.light_var.get()
+        if self.sprites.available:
+            self.sprites.set_theme(light)
+        else:
+            body, edge = apple_colors(light)
+            self.canvas.itemconfig("apple_body", fill=body, outline=edge)
 
     def toggle_bgm(self) -> None:
         self.audio.set_bgm_enabled(self.bgm_var.get())
@@ -532,23 +938,27 @@ class AppleBoxGame:
     def set_paused(self, paused: bool) -> None:
         self.paused = paused
         self.pause_btn.config(text="재개" if paused else "일시정지")
-        self.canvas.itemconfig(self.pause_overlay_id, state="normal" if paused else "hidden")
-        self.canvas.itemconfig(self.pause_text_id, state="normal" if paused else "hidden")
+        self.renderer.itemconfig(self.pause_overlay_id, state="normal" if paused else "hidden")
+        self.renderer.itemconfig(self.pause_text_id, state="normal" if paused else "hidden")
 
         if paused:
             self.cancel_timer_job()
+            self.cancel_replay_job()
             self.audio.stop_bgm()
-            self.canvas.delete(self.selection_cell_tag)
-            self.canvas.itemconfig(self.selection_id, state="hidden")
+            self.hide_selection()
+            self.hide_hint()
             self.drag_start = None
             self.drag_current = None
-            self.canvas.itemconfig(self.info_id, text="일시정지")
+            self.renderer.itemconfig(self.info_id, text="일시정지")
+            self.autosave()
         else:
-            if self.started and not self.game_over:
+            if self.replaying:
+                self.schedule_replay_move()
+            elif self.started and not self.game_over:
                 self.start_timer()
             if self.bgm_var.get():
                 self.audio.start_bgm()
-            self.canvas.itemconfig(self.info_id, text="사각형으로 선택한 범위의 합이 10이면 제거")
+            self.renderer.itemconfig(self.info_id, text="사각형으로 선택한 범위의 합이 10이면 제거")
 
     def board_left(self) -> int:
         return self.board_x
@@ -557,21 +967,25 @@ class AppleBoxGame:
         return self.board_y
 
     def make_cell(self, r: int, c: int, value: int) -> Cell:
+        # (r, c)는 보드 좌표가 아니라 화면 안의 칸 자리다.
         x = self.board_x + c * self.cell_size
         y = self.board_y + r * self.cell_size
 
+        if self.sprites.available:
+            image = self.sprites.display(value)
+            half = self.cell_size / 2
+            image_id = self.canvas.create_image(x + half, y + half, image=image, tags=("cell",))
+            return Cell(value=value, item_ids=[image_id])
+
         margin = 5
         x1 = x + margin
         y1 = y + margin
         x2 = x + self.cell_size - margin
         y2 = y + self.cell_size - margin
 
-        light = self.light_var.get()
-        body = "#ff4a3d" if light else "#ef3f33"
-        edge = "#e73a2e" if light else "#cc3027"
-
+        body, edge = apple_colors(self.light_var.get())
         shadow_id = self.canvas.create_oval(x1 + 1, y1 + 3, x2 + 1, y2 + 3, fill="#d7352c", outline="", tags=("cell",))
-        apple_id = self.canvas.create_oval(x1, y1, x2, y2, fill=body, outline=edge, width=2, tags=("cell",))
+        apple_id = self.canvas.create_oval(x1, y1, x2, y2, fill=body, outline=edge, width=2, tags=("cell", "apple_body"))
         rim_id = self.canvas.create_oval(x1 + 1, y1 + 1, x2 - 1, y2 - 1, outline="#ffb4ab", width=1, tags=("cell",))
         shade_id = self.canvas.create_arc(
             x1 + 1,
@@ -592,6 +1006,7 @@ class AppleBoxGame:
 
         tx = int((x1 + x2) / 2)
         ty = int((y1 + y2) / 2) + 1
+        font_size = max(8, round(16 * self.cell_size / 34))
         outline_ids: list[int] = []
         for ox, oy in [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1)]:
             outline_ids.append(
@@ -599,12 +1014,12 @@ class AppleBoxGame:
                     tx + ox,
                     ty + oy,
                     text=str(value),
-                    font=("Arial", 16, "bold"),
+                    font=("Arial", font_size, "bold"),
                     fill="#cf3f0a",
                     tags=("cell",),
                 )
             )
-        text_id = self.canvas.create_text(tx, ty, text=str(value), font=("Arial", 16, "bold"), fill="white", tags=("cell",))
+        text_id = self.canvas.create_text(tx, ty, text=str(value), font=("Arial", font_size, "bold"), fill="white", tags=("cell",))
 
         item_ids = [
             shadow_id,
@@ -618,70 +1033,295 @@ class AppleBoxGame:
         ]
         return Cell(value=value, item_ids=item_ids)
 
+    def set_cell_value(self, cell: Cell, value: int) -> None:
+        # 값 0은 빈 칸이다. 숨겼던 칸에 값이 들어오면 다시 보인다.
+        if cell.value == value:
+            return
+        if value == 0:
+            self.hide_cell(cell)
+        elif self.sprites.available:
+            self.renderer.itemconfig(cell.item_ids[0], image=self.sprites.display(value), state="normal")
+        else:
+            text = str(value)
+            # 태그로 찾으면 캔버스 전체를 훑으므로 아이템 ID로 직접 바꾼다. 앞의 6개는 도형, 나머지는 숫자.
+            for item_id in cell.item_ids[6:]:
+                self.renderer.itemconfig(item_id, text=text)
+            if cell.value == 0:
+                self.show_cell(cell)
+        cell.value = value
+
+    def hide_cell(self, cell: Cell) -> None:
+        for item_id in cell.item_ids:
+            self.renderer.itemconfig(item_id, state="hidden")
+
+    def show_cell(self, cell: Cell) -> None:
+        for item_id in cell.item_ids:
+            self.renderer.itemconfig(item_id, state="normal")
+
+    def delete_cells(self) -> None:
+        for row in self.grid:
+            for cell in row:
+                for item_id in cell.item_ids:
+                    self.canvas.delete(item_id)
+                    self.renderer.forget(item_id)
+        self.grid = []
+        for item_id in self.selection_items.values():
+            self.canvas.delete(item_id)
+            self.renderer.forget(item_id)
+        self.selection_items.clear()
+
+    def sprite_cache(self, cell_size: int) -> SpriteCache:
+        cache = self.sprite_caches.get(cell_size)
+        if cache is None:
+            font_px = max(8, round(self.font_px * cell_size / 34))
+            cache = SpriteCache(self.root, cell_size, font_px)
+            self.sprite_caches[cell_size] = cache
+        return cache
+
+    @property
+    def virtual(self) -> bool:
+        return self.rows > MAX_VIEW_ROWS or self.cols > MAX_VIEW_COLS
+
+    def scroll_view(self, dr: int, dc: int) -> None:
+        top = max(0, min(self.rows - self.view_rows, self.view_top + dr))
+        left = max(0, min(self.cols - self.view_cols, self.view_left + dc))
+        if (top, left) == (self.view_top, self.view_left):
+            return
+        self.hide_hint()
+        # 선택 강조는 화면 자리 기준이므로 옮기기 전에 지운다. 선택 좌표는 보드 기준이라 그대로 둔다.
+        self.hide_selection()
+        self.view_top = top
+        self.view_left = left
+        self.sync_cells()
+        self.update_view_ui()
+        if self.drag_start is not None:
+            if self.drag_pointer is not None:
+                self.drag_current = self.pixel_to_cell(*self.drag_pointer, clamp=True)
+            self.show_selection_box()
+
+    def tick_autoscroll(self, now: float) -> bool:
+        # 드래그하는 동안 프레임마다 불린다. 포인터가 가장자리에 있으면 화면을 넘긴다.
+        if self.drag_start is None or self.drag_pointer is None:
+            return False
+        if now - self.autoscroll_at < AUTOSCROLL_MS / 1000:
+            return True
+        x, y = self.drag_pointer
+        right = self.board_x + self.view_cols * self.cell_size
+        bottom = self.board_y + self.view_rows * self.cell_size
+        dr = -1 if y < self.board_y + AUTOSCROLL_EDGE else 1 if y > bottom - AUTOSCROLL_EDGE else 0
+        dc = -1 if x < self.board_x + AUTOSCROLL_EDGE else 1 if x > right - AUTOSCROLL_EDGE else 0
+        if dr or dc:
+            self.autoscroll_at = now
+            self.scroll_view(dr, dc)
+        return True
+
+    def zoom_view(self, step: int) -> None:
+        # 판이 차지하는 픽셀 크기는 그대로 두고 칸 크기만 바꾼다. 화면보다 큰 보드에서만 쓴다.
+        if not self.virtual or self.drag_start is not None:
+            return
+        index = ZOOM_CELL_SIZES.index(self.cell_size) if self.cell_size in ZOOM_CELL_SIZES else 0
+        index = max(0, min(len(ZOOM_CELL_SIZES) - 1, index + step))
+        if ZOOM_CELL_SIZES[index] == self.cell_size:
+            return
+        center_r = self.view_top + self.view_rows / 2
+        center_c = self.view_left + self.view_cols / 2
+        self.cell_size = ZOOM_CELL_SIZES[index]
+        self.view_rows = min(self.rows, self.board_h // self.cell_size)
+        self.view_cols = min(self.cols, self.board_w // self.cell_size)
+        self.view_top = max(0, min(self.rows - self.view_rows, int(center_r - self.view_rows / 2)))
+        self.view_left = max(0, min(self.cols - self.view_cols, int(center_c - self.view_cols / 2)))
+
+        self.hide_selection()
+        self.hide_hint()
+        self.delete_cells()
+        self.sprites = self.sprite_cache(self.cell_size)
+        self.sprites.set_theme(self.light_var.get())
+        self.background_image = self.load_background_image()
+        self.renderer.itemconfig(self.background_id, image=self.background_image)
+        self.sync_cells()
+        self.update_view_ui()
+
+    def on_wheel(self, event: tk.Event) -> None:
+        # Windows/macOS는 delta, X11은 Button-4/5로 온다. Shift는 가로, Ctrl은 확대/축소.
+        if getattr(event, "num", None) == 4:
+            direction = -1
+        elif getattr(event, "num", None) == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        state = int(getattr(event, "state", 0))
+        if state & 0x4:
+            self.zoom_view(-direction)
+        elif state & 0x1:
+            self.scroll_view(0, direction * SCROLL_STEP)
+        else:
+            self.scroll_view(direction * SCROLL_STEP, 0)
+
+    def update_view_ui(self) -> None:
+        text = ""
+        if self.virtual:
+            text = (
+                f"{self.view_top + 1}-{self.view_top + self.view_rows}/{self.rows}행  "
+                f"{self.view_left + 1}-{self.view_left + self.view_cols}/{self.cols}열"
+            )
+        self.renderer.itemconfig(self.view_pos_id, text=text)
+
     def update_score_ui(self) -> None:
-        self.canvas.itemconfig(self.score_id, text=f"SCORE {self.score}")
+        self.renderer.itemconfig(self.score_id, text=f"SCORE {self.score}")
+        self.renderer.itemconfig(self.moves_left_id, text=f"남은 수 {len(self.move_index)}")
 
-    def pixel_to_cell(self, x: int, y: int) -> tuple[int, int] | None:
+    def pixel_to_cell(self, x: int, y: int, clamp: bool = False) -> tuple[int, int] | None:
+        # clamp면 판 밖의 좌표도 가장 가까운 화면 가장자리 칸으로 맞춘다.
         bx = x - self.board_x
         by = y - self.board_y
-        if bx < 0 or by < 0:
+        if not clamp and (bx < 0 or by < 0):
             return None
-        c = bx // self.cell_size
-        r = by // self.cell_size
-        if r < 0 or c < 0 or r >= self.rows or c >= self.cols:
+        c = int(bx // self.cell_size)
+        r = int(by // self.cell_size)
+        if clamp:
+            r = max(0, min(self.view_rows - 1, r))
+            c = max(0, min(self.view_cols - 1, c))
+        elif r >= self.view_rows or c >= self.view_cols:
             return None
-        return int(r), int(c)
-
-    def normalize_range(self, a: int, b: int) -> tuple[int, int]:
-        return (a, b) if a <= b else (b, a)
+        return self.view_top + r, self.view_left + c
 
     def get_selection_cells(self) -> list[tuple[int, int]]:
         if self.drag_start is None or self.drag_current is None:
             return []
 
-        sr, sc = self.drag_start
-        er, ec = self.drag_current
-        r1, r2 = self.normalize_range(sr, er)
-        c1, c2 = self.normalize_range(sc, ec)
-
-        cells: list[tuple[int, int]] = []
-        for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                if self.grid[r][c] is not None:
-                    cells.append((r, c))
-        return cells
+        rect = normalize_rect(self.drag_start, self.drag_current)
+        return [divmod(i, self.cols) for i in self.board.select(rect)]
 
     def show_selection_box(self) -> None:
         if self.drag_start is None or self.drag_current is None:
-            self.canvas.delete(self.selection_cell_tag)
-            self.canvas.itemconfig(self.selection_id, state="hidden")
+            self.hide_selection()
             return
 
-        sr, sc = self.drag_start
-        er, ec = self.drag_current
-        r1, r2 = self.normalize_range(sr, er)
-        c1, c2 = self.normalize_range(sc, ec)
-
+        rect = normalize_rect(self.drag_start, self.drag_current)
+        old = self.selection_rect
+        if rect == old:
+            return
+        self.selection_rect = rect
+        x1, y1, x2, y2 = self.rect_pixels(rect)
+
+        self.renderer.coords(self.selection_id, x1, y1, x2, y2)
+        if old is None:
+            self.renderer.itemconfig(self.selection_id, state="normal")
+        self.update_selection_sum(self.rect_sums.query(rect), x2, y1, show=old is None)
+
+        # 이전 범위와 달라진 칸만 숨기거나 보인다.
+        new_cells = self.rect_indices(rect)
+        old_cells = self.rect_indices(old) if old is not None else set()
+        for index in old_cells - new_cells:
+            self.renderer.itemconfig(self.selection_items[index], state="hidden")
+        for index in new_cells - old_cells:
+            item_id = self.selection_items.get(index)
+            if item_id is None:
+                self.selection_items[index] = self.make_selection_item(index)
+            else:
+                self.renderer.itemconfig(item_id, state="normal")
+
+    def rect_pixels(self, rect: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+        # 화면 밖으로 나간 부분은 판 가장자리에서 자른다.
+        r1 = max(rect[0] - self.view_top, 0)
+        c1 = max(rect[1] - self.view_left, 0)
+        r2 = min(rect[2] - self.view_top, self.view_rows - 1)
+        c2 = min(rect[3] - self.view_left, self.view_cols - 1)
         x1 = self.board_x + c1 * self.cell_size + 2
         y1 = self.board_y + r1 * self.cell_size + 2
         x2 = self.board_x + (c2 + 1) * self.cell_size - 2
         y2 = self.board_y + (r2 + 1) * self.cell_size - 2
+        return x1, y1, x2, y2
 
-        self.canvas.coords(self.selection_id, x1, y1, x2, y2)
-        self.canvas.itemconfig(self.selection_id, state="normal")
+    def show_hint(self) -> None:
+        if self.game_over or self.paused or not self.started or self.replaying:
+            return
+        # 새 수를 찾는 중이면 그 결과까지 넣어야 빠진 수 없이 고른다.
+        self.settle_move_scan()
+        hints = HintEngine(self.board, self.move_index).top(1)
+        if not hints:
+            if not self.has_possible_ten():
+                self.finish_game("더 이상 10을 만들 수 없음")
+            return
+        rect = hints[0].rect
+        self.scroll_to_rect(rect)
+        self.renderer.coords(self.hint_id, *self.rect_pixels(rect))
+        self.renderer.itemconfig(self.hint_id, state="normal")
+        self.canvas.tag_raise(self.hint_id)
+        if self.hint_job is not None:
+            self.root.after_cancel(self.hint_job)
+        self.hint_job = self.root.after(HINT_MS, self.hide_hint)
+
+    def hide_hint(self) -> None:
+        if self.hint_job is None:
+            return
+        self.root.after_cancel(self.hint_job)
+        self.hint_job = None
+        self.renderer.itemconfig(self.hint_id, state="hidden")
+
+    def update_selection_sum(self, total: int, x: int, y: int, show: bool) -> None:
+        # 선택 상자 오른쪽 위 모서리에 현재 합을 띄운다. 10이면 초록, 넘치면 빨강.
+        color = "#0ea5e9"
+        if total == TARGET_SUM:
+            color = "#16a34a"
+        elif total > TARGET_SUM:
+            color = "#f04a2f"
+        text = str(total)
+        w = 8 + 8 * len(text)
+        h = 18
+        self.renderer.coords(self.selection_sum_bg_id, x - w, y, x, y + h)
+        self.renderer.itemconfig(self.selection_sum_bg_id, fill=color)
+        self.renderer.coords(self.selection_sum_id, x - w / 2, y + h / 2)
+        self.renderer.itemconfig(self.selection_sum_id, text=text)
+        if show:
+            self.renderer.itemconfig(self.selection_sum_bg_id, state="normal")
+            self.renderer.itemconfig(self.selection_sum_id, state="normal")
+            # 사과 아이템보다 나중에 보이도록 맨 위로 올린다.
+            self.canvas.tag_raise(self.selection_sum_bg_id)
+            self.canvas.tag_raise(self.selection_sum_id)
+
+    def hide_selection(self) -> None:
+        self.cancel_selection_redraw()
+        old = self.selection_rect
+        if old is None:
+            return
+        self.selection_rect = None
+        self.renderer.itemconfig(self.selection_id, state="hidden")
+        self.renderer.itemconfig(self.selection_sum_bg_id, state="hidden")
+        self.renderer.itemconfig(self.selection_sum_id, state="hidden")
+        for index in self.rect_indices(old):
+            self.renderer.itemconfig(self.selection_items[index], state="hidden")
+
+    def rect_indices(self, rect: tuple[int, int, int, int]) -> set[int]:
+        # 범위 중 화면에 보이는 칸 자리 번호만 돌려준다.
+        r1 = max(rect[0] - self.view_top, 0)
+        c1 = max(rect[1] - self.view_left, 0)
+        r2 = min(rect[2] - self.view_top, self.view_rows - 1)
+        c2 = min(rect[3] - self.view_left, self.view_cols - 1)
+        return {r * self.view_cols + c for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)}
+
+    def make_selection_item(self, index: int) -> int:
+        r, c = divmod(index, self.view_cols)
+        cx1 = self.board_x + c * self.cell_size + 1
+        cy1 = self.board_y + r * self.cell_size + 1
+        cx2 = cx1 + self.cell_size - 2
+        cy2 = cy1 + self.cell_size - 2
+        return self.canvas.create_rectangle(cx1, cy1, cx2, cy2, outline="#38bdf8", width=2, tags=(self.selection_cell_tag,))
+
+    def request_selection_redraw(self) -> None:
+        # 모션 이벤트가 몰려도 한 프레임에 한 번만 다시 그린다.
+        self.frame_loop.request("selection", self.flush_selection)
+
+    def flush_selection(self) -> None:
+        self.show_selection_box()
 
-        self.canvas.delete(self.selection_cell_tag)
-        for r in range(r1, r2 + 1):
-            for c in range(c1, c2 + 1):
-                cx1 = self.board_x + c * self.cell_size + 1
-                cy1 = self.board_y + r * self.cell_size + 1
-                cx2 = cx1 + self.cell_size - 2
-                cy2 = cy1 + self.cell_size - 2
-                self.canvas.create_rectangle(cx1, cy1, cx2, cy2, outline="#38bdf8", width=2, tags=(self.selection_cell_tag,))
+    def cancel_selection_redraw(self) -> None:
+        self.frame_loop.cancel("selection")
 
     def on_press(self, event: tk.Event) -> None:
-        if self.game_over or self.paused or not self.started:
+        if self.game_over or self.paused or not self.started or self.replaying:
             return
+        self.hide_hint()
         cell = self.pixel_to_cell(event.x, event.y)
         if cell is None:
             self.drag_start = None
@@ -690,145 +1330,508 @@ class AppleBoxGame:
             return
         self.drag_start = cell
         self.drag_current = cell
+        self.drag_pointer = (event.x, event.y)
         self.show_selection_box()
+        if self.virtual:
+            self.frame_loop.add("autoscroll", self.tick_autoscroll)
 
     def on_drag(self, event: tk.Event) -> None:
-        if self.drag_start is None or self.game_over or self.paused or not self.started:
+        if self.drag_start is None or self.game_over or self.paused or not self.started or self.replaying:
             return
-        cell = self.pixel_to_cell(event.x, event.y)
-        if cell is None:
+        self.drag_pointer = (event.x, event.y)
+        # 판 밖으로 나가도 가장자리 칸까지 고르고, 자동 스크롤이 나머지를 넘긴다.
+        cell = self.pixel_to_cell(event.x, event.y, clamp=self.virtual)
+        if cell is None or cell == self.drag_current:
             return
         self.drag_current = cell
-        self.show_selection_box()
+        self.request_selection_redraw()
 
     def on_release(self, event: tk.Event) -> None:
-        if self.drag_start is None or self.game_over or self.paused or not self.started:
+        if self.drag_start is None or self.game_over or self.paused or not self.started or self.replaying:
             return
 
         cell = self.pixel_to_cell(event.x, event.y)
         if cell is not None:
             self.drag_current = cell
+        self.apply_selection(self.drag_start, self.drag_current)
 
-        selected = self.get_selection_cells()
-        self.canvas.delete(self.selection_cell_tag)
-        self.canvas.itemconfig(self.selection_id, state="hidden")
-
-        if not selected:
+    def apply_selection(self, start: tuple[int, int], current: tuple[int, int]) -> None:
+        # 시간이 다 된 뒤 다음 프레임의 타이머보다 먼저 놓은 선택은 두지 않고 게임을 끝낸다.
+        # 기록에 남기는 시각도 여기서 잰 값을 써서 replay.verify의 시간 제한 검사와 어긋나지 않게 한다.
+        elapsed_ms = self.play_elapsed_ms()
+        if not self.replaying and elapsed_ms >= self.time_limit * 1000:
+            self.drag_start = None
+            self.drag_current = None
+            self.finish_game("시간 종료")
+            return
+        self.drag_start = start
+        self.drag_current = current
+        rect = normalize_rect(start, current)
+        total = self.rect_sums.query(rect)
+        self.hide_selection()
+
+        # 사과 값은 1 이상이므로 합이 0이면 빈 칸만 고른 것이다.
+        if total == 0:
             self.drag_start = None
             self.drag_current = None
             return
 
+        if self.replay is not None and not self.replaying:
+            self.replay.record(start, current, elapsed_ms)
         self.moves += 1
-        total = sum(self.grid[r][c].value for r, c in selected if self.grid[r][c] is not None)
+        apples = self.board.count(rect) if self.telemetry is not None else 0
 
-        if total == 10:
+        if total == TARGET_SUM:
+            selected = self.get_selection_cells()
+            self.history.push(self.board, [self.board.index(r, c) for r, c in selected])
             self.remove_cells(selected)
             self.score += 10
             self.audio.play_clear()
             self.update_score_ui()
-            self.canvas.itemconfig(self.info_id, text=f"성공! +10 ({len(selected)}개 제거)")
+            self.renderer.itemconfig(self.info_id, text=f"성공! +10 ({len(selected)}개 제거)")
+            self.log_move(HIT, rect, apples, total)
             if not self.has_possible_ten():
                 self.finish_game("더 이상 10을 만들 수 없음")
         else:
             self.audio.play_fail()
-            self.canvas.itemconfig(self.info_id, text=f"합계 {total} (10이 아님)")
+            self.log_move(MISS, rect, apples, total)
+            self.renderer.itemconfig(self.info_id, text=f"합계 {total} (10이 아님)")
 
         self.drag_start = None
         self.drag_current = None
+        self.autosave()
 
     def remove_cells(self, cells: list[tuple[int, int]]) -> None:
         for r, c in cells:
-            cell = self.grid[r][c]
-            if cell is None:
-                continue
-            for item_id in cell.item_ids:
-                self.canvas.delete(item_id)
-            self.grid[r][c] = None
+            value = self.board.value(r, c)
+            if value:
+                vr = r - self.view_top
+                vc = c - self.view_left
+                if self.grid and 0 <= vr < self.view_rows and 0 <= vc < self.view_cols:
+                    self.set_cell_value(self.grid[vr][vc], 0)
+                self.rect_sums.add(r, c, -value)
+        changed = self.move_index.remove([self.board.index(r, c) for r, c in cells], rescan=False)
+        if changed is not None:
+            self.schedule_move_scan(changed)
+
+    def restore_cells(self, cells: list[tuple[int, int]]) -> None:
+        # 지울 때 숨겨 둔 풀 아이템을 값만 바꿔 다시 보인다.
+        for i, value in cells:
+            r, c = divmod(i, self.cols)
+            vr = r - self.view_top
+            vc = c - self.view_left
+            if self.grid and 0 <= vr < self.view_rows and 0 <= vc < self.view_cols:
+                self.set_cell_value(self.grid[vr][vc], value)
+            self.rect_sums.add(r, c, value)
+        changed = self.move_index.restore(cells, rescan=False)
+        if changed is not None:
+            self.schedule_move_scan(changed)
+
+    def schedule_move_scan(self, changed: Rect) -> None:
+        """바뀐 범위에서 새 수를 찾는 일을 작업 스레드에 넘긴다.
+
+        아직 반영하지 않은 범위를 모두 모아 지금 보드의 사본으로 다시 찾는다. 앞선 요청은 취소하고,
+        이미 돌고 있었다면 도착했을 때 버전이 달라 버려진다.
+        """
+        self.dirty_rects.append(changed)
+        self.board_version += 1
+        version = self.board_version
+        if self.scan_future is not None:
+            self.scan_future.cancel()
+        if self.scan_executor is None:
+            self.scan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="movescan")
+        future = self.scan_executor.submit(
+            scan_moves, self.board.rows, self.board.cols, bytes(self.board.values), list(self.dirty_rects)
+        )
+        self.scan_future = future
+        self.watch_future(future, lambda done: self.on_moves_scanned(done, version))
+
+    def on_moves_scanned(self, future: Future, version: int) -> None:
+        if version != self.board_version or future.cancelled():
+            return
+        self.scan_future = None
+        self.dirty_rects.clear()
+        self.move_index.merge(future.result())
+        self.update_score_ui()
+        if not self.has_possible_ten():
+            self.finish_game("더 이상 10을 만들 수 없음")
 
-    def _area_sum(self, prefix: list[list[int]], r1: int, c1: int, r2: int, c2: int) -> int:
-        return prefix[r2 + 1][c2 + 1] - prefix[r1][c2 + 1] - prefix[r2 + 1][c1] + prefix[r1][c1]
+    def settle_move_scan(self) -> None:
+        """찾는 중인 수를 기다리지 않고 이 스레드에서 바로 찾아 반영한다. 바뀐 범위만 훑으므로 짧다."""
+        if not self.dirty_rects:
+            return
+        rects = list(self.dirty_rects)
+        self.cancel_move_scan()
+        self.move_index.merge(scan_moves(self.board.rows, self.board.cols, bytes(self.board.values), rects))
+        self.update_score_ui()
+
+    def cancel_move_scan(self) -> None:
+        # 보드를 새로 만들면 진행 중인 결과는 모두 낡은 것이 된다.
+        self.board_version += 1
+        self.dirty_rects.clear()
+        if self.scan_future is not None:
+            self.scan_future.cancel()
+            self.scan_future = None
+
+    def undo_move(self) -> None:
+        """마지막으로 지운 수를 되돌린다. 되돌린 판은 연습으로 보고 랭킹에 남기지 않는다."""
+        if self.game_over or self.paused or not self.started or self.replaying:
+            return
+        cells = self.history.undo()
+        if cells is None:
+            return
+        self.hide_hint()
+        self.restore_cells(cells)
+        self.score -= 10
+        self.assisted = True
+        self.update_score_ui()
+        self.renderer.itemconfig(self.info_id, text=f"되돌리기 ({len(self.history)}번 더 가능, 연습 모드)")
+        self.autosave()
+
+    def redo_move(self) -> None:
+        if self.game_over or self.paused or not self.started or self.replaying:
+            return
+        cells = self.history.redo()
+        if cells is None:
+            return
+        self.hide_hint()
+        self.remove_cells([divmod(i, self.cols) for i in cells])
+        self.score += 10
+        self.update_score_ui()
+        self.renderer.itemconfig(self.info_id, text=f"다시 하기 ({len(self.history.undone)}번 더 가능)")
+        if not self.has_possible_ten():
+            self.finish_game("더 이상 10을 만들 수 없음")
+        self.autosave()
 
     def has_possible_ten(self) -> bool:
-        val_prefix = [[0] * (self.cols + 1) for _ in range(self.rows + 1)]
-        for r in range(self.rows):
-            for c in range(self.cols):
-                value = 0 if self.grid[r][c] is None else self.grid[r][c].value
-                val_prefix[r + 1][c + 1] = value + val_prefix[r][c + 1] + val_prefix[r + 1][c] - val_prefix[r][c]
-
-        for r1 in range(self.rows):
-            for r2 in range(r1, self.rows):
-                for c1 in range(self.cols):
-                    for c2 in range(c1, self.cols):
-                        if self._area_sum(val_prefix, r1, c1, r2, c2) == 10:
-                            return True
-        return False
+        # 새 수를 아직 찾는 중이면 끝났다고 하지 않는다. 결과가 오면 on_moves_scanned가 다시 본다.
+        return bool(self.move_index) or bool(self.dirty_rects)
 
     def finish_game(self, reason: str) -> None:
         if self.game_over:
             return
         self.game_over = True
         self.cancel_timer_job()
-        self.canvas.delete(self.selection_cell_tag)
-        self.canvas.itemconfig(self.selection_id, state="hidden")
-        self.canvas.itemconfig(self.info_id, text=f"게임 종료: {reason} | 최종 점수 {self.score}")
-        self.record_current_score()
+        self.hide_selection()
+        self.hide_hint()
+        self.renderer.itemconfig(self.info_id, text=f"게임 종료: {reason} | 최종 점수 {self.score}")
+        # 새 수를 아직 찾는 중이었다면 남은 수가 있을 수 있으므로 시간 종료로 본다.
+        self.log_event(END, self.score, self.moves, 0, TIMEOUT if self.has_possible_ten() else NO_MOVES)
+        if self.autosaver is not None and not self.replaying:
+            self.autosaver.clear()
+        if self.assisted:
+            self.renderer.itemconfig(self.info_id, text=f"게임 종료: {reason} | 연습 점수 {self.score} (기록하지 않음)")
+        elif not self.replaying:
+            self.record_current_score()
+
+    def log_event(self, kind: int, a: int = 0, b: int = 0, c: int = 0, d: int = 0, e: int = 0) -> None:
+        # 판의 첫 기록 앞에 START를 붙인다. 리플레이는 기록하지 않는다.
+        if self.telemetry is None or self.replaying or self.replay is None:
+            return
+        session = self.replay.seed
+        if not self.session_logged:
+            self.session_logged = True
+            self.telemetry.write(START, session, 0, self.initial_moves, self.time_limit, self.rows, self.cols)
+        self.telemetry.write(kind, session, self.play_elapsed_ms(), a, b, c, d, e)
+
+    def log_move(self, kind: int, rect: tuple[int, int, int, int], apples: int, total: int) -> None:
+        now = self.play_elapsed_ms()
+        r1, c1, r2, c2 = rect
+        # 기록을 남길 때는 새로 생긴 수까지 세도록 찾는 중인 수를 먼저 반영한다.
+        if self.telemetry is not None and not self.replaying:
+            self.settle_move_scan()
+        self.log_event(kind, now - self.last_move_ms, len(self.move_index), (r2 - r1 + 1) * (c2 - c1 + 1), apples, total)
+        self.last_move_ms = now
+
+    def abandon_session(self) -> None:
+        """끝나지 않은 판을 새 게임이나 창 닫기로 버리면 그렇게 끝났다고 남긴다."""
+        if self.session_logged and not self.game_over:
+            self.log_event(END, self.score, self.moves, 0, ABANDONED)
+
+    def snapshot(self) -> SaveState:
+        return SaveState(
+            self.rows,
+            self.cols,
+            self.time_limit,
+            self.replay.seed if self.replay is not None else 0,
+            self.score,
+            self.moves,
+            self.play_clock.elapsed(),
+            bytes(self.board.values),
+            self.assisted,
+            list(self.replay.moves) if self.replay is not None else [],
+        )
+
+    def autosave(self) -> None:
+        # 보드 값만 복사해 넘기고 묶기와 파일 쓰기는 저장 스레드가 한다.
+        if self.autosaver is None or not self.started or self.game_over or self.replaying:
+            return
+        self.autosaver.save(self.snapshot())
+
+    def resume_game(self, state: SaveState) -> None:
+        """저장한 판을 일시정지 상태로 연다. 보드는 저장한 값으로 바로 만들고 무작위로 채우지 않는다."""
+        if (state.rows, state.cols) != (self.rows, self.cols):
+            raise ValueError(f"save is for a {state.rows}x{state.cols} board")
+        self.cancel_timer_job()
+        self.stop_replay()
+        self.hide_hint()
+        self.hide_selection()
+        self.started = True
+        self.game_over = False
+        self.time_limit = state.time_limit
+        self.score = state.score
+        self.moves = state.moves
+        self.play_clock.reset(state.elapsed)
+
+        self.board = Board(state.rows, state.cols, state.values)
+        self.replay = state.replay()
+        self.history = History()
+        self.assisted = state.assisted
+        self.move_index = MoveIndex(self.board)
+        self.rect_sums = RectSums(self.board)
+        self.cancel_move_scan()
+        self.session_logged = False
+        self.initial_moves = len(self.move_index)
+        self.last_move_ms = int(state.elapsed * 1000)
+        self.sync_cells()
+
+        self.update_score_ui()
+        self.update_timer_ui()
+        self.update_view_ui()
+        self.renderer.itemconfig(self.start_overlay_id, state="hidden")
+        self.renderer.itemconfig(self.start_text_id, state="hidden")
+        self.set_paused(True)
+        self.renderer.itemconfig(self.info_id, text="저장한 게임을 불러왔습니다. 재개를 누르면 이어 합니다.")
 
     def start_game(self) -> None:
         self.started = True
         self.reset_game()
 
-    def load_rankings(self) -> list[dict[str, str | int]]:
-        if not self.rank_path.exists():
-            return []
+    def play_replay(self, replay: Replay, speed: float = 1.0) -> None:
+        """기록을 같은 보드에서 다시 둔다. 입력과 점수 저장은 막고, speed배로 빨리 돌린다."""
+        if (replay.rows, replay.cols) != (self.rows, self.cols):
+            raise ValueError(f"replay is for a {replay.rows}x{replay.cols} board")
+        self.started = True
+        self.time_limit = replay.time_limit
+        self.reset_game(seed=replay.seed)
+        self.cancel_timer_job()
+        self.replaying = True
+        self.replay_source = replay
+        self.replay_speed = speed
+        self.replay_step = 0
+        self.replay_t = 0
+        self.schedule_replay_move()
+
+    def schedule_replay_move(self) -> None:
+        self.cancel_replay_job()
+        if self.replay_source is None or self.game_over:
+            return
+        moves = self.replay_source.moves
+        if self.replay_step >= len(moves):
+            self.game_over = True
+            self.renderer.itemconfig(self.info_id, text=f"리플레이 끝 | 점수 {self.score}")
+            return
+        wait = (moves[self.replay_step][4] - self.replay_t) / self.replay_speed - REPLAY_HOLD_MS / self.replay_speed
+        self.replay_job = self.root.after(max(0, int(wait)), self.show_replay_move)
+
+    def show_replay_move(self) -> None:
+        sr, sc, cr, cc, t_ms = self.replay_source.moves[self.replay_step]
+        self.replay_t = t_ms
+        self.update_timer_ui(self.time_limit - t_ms / 1000)
+        self.scroll_to_rect(normalize_rect((sr, sc), (cr, cc)))
+        self.drag_start = (sr, sc)
+        self.drag_current = (cr, cc)
+        self.show_selection_box()
+        self.renderer.itemconfig(
+            self.info_id,
+            text=f"리플레이 {self.replay_step + 1}/{len(self.replay_source.moves)} ({self.replay_speed:g}배속)",
+        )
+        self.replay_job = self.root.after(int(REPLAY_HOLD_MS / self.replay_speed), self.apply_replay_move)
+
+    def apply_replay_move(self) -> None:
+        self.replay_job = None
+        sr, sc, cr, cc, _ = self.replay_source.moves[self.replay_step]
+        self.replay_step += 1
+        self.apply_selection((sr, sc), (cr, cc))
+        self.schedule_replay_move()
+
+    def change_replay_speed(self, factor: float) -> None:
+        if not self.replaying:
+            return
+        self.replay_speed = max(0.25, min(16.0, self.replay_speed * factor))
+        self.renderer.itemconfig(self.info_id, text=f"리플레이 {self.replay_speed:g}배속")
+
+    def cancel_replay_job(self) -> None:
+        if self.replay_job is not None:
+            self.root.after_cancel(self.replay_job)
+            self.replay_job = None
+        if self.replaying:
+            self.hide_selection()
+            self.drag_start = None
+            self.drag_current = None
+
+    def stop_replay(self) -> None:
+        self.cancel_replay_job()
+        self.replaying = False
+        self.replay_source = None
+
+    def scroll_to_rect(self, rect: tuple[int, int, int, int]) -> None:
+        r1, c1, r2, c2 = rect
+        top = self.view_top
+        if r1 < top or r2 >= top + self.view_rows:
+            top = r1 if r1 < top else r2 - self.view_rows + 1
+        left = self.view_left
+        if c1 < left or c2 >= left + self.view_cols:
+            left = c1 if c1 < left else c2 - self.view_cols + 1
+        self.scroll_view(top - self.view_top, left - self.view_left)
+
+    def open_rank_store(self) -> RankingStore | None:
         try:
-            with self.rank_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                return data
-        except (json.JSONDecodeError, OSError):
-            pass
-        return []
+            return RankingStore(self.rank_db_path, legacy_json=self.rank_path)
+        except sqlite3.Error:
+            return None
 
-    def save_rankings(self, rankings: list[dict[str, str | int]]) -> None:
-        with self.rank_path.open("w", encoding="utf-8") as f:
-            json.dump(rankings, f, ensure_ascii=False, indent=2)
+    def load_rankings(self, limit: int = 10) -> list[dict[str, str | int]]:
+        if self.rank_store is None:
+            return []
+        try:
+            return self.rank_store.top(limit)
+        except sqlite3.Error:
+            return []
 
     def record_current_score(self) -> None:
         name = simpledialog.askstring("점수 기록", f"점수 {self.score}점을 기록할 이름을 입력하세요:", parent=self.root)
         if name is None:
             return
         clean_name = name.strip() or "Player"
-
-        rankings = self.load_rankings()
-        rankings.append(
-            {
-                "name": clean_name[:20],
-                "score": int(self.score),
-                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
+        entry = (
+            clean_name[:20],
+            int(self.score),
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            self.replay.to_bytes() if self.replay is not None else None,
         )
-        rankings.sort(key=lambda item: int(item.get("score", 0)), reverse=True)
-        self.save_rankings(rankings[:10])
+        if self.leaderboard is not None:
+            future = self.leaderboard.submit(*entry)
+            self.sending_scores[future] = entry
+            self.watch_future(future, lambda future: self.on_score_sent(future, entry))
+            return
+        if self.store_score_locally(entry):
+            self.refresh_rank_panel()
+
+    def store_score_locally(self, entry: tuple[str, int, str, bytes | None]) -> bool:
+        if self.rank_store is None:
+            return False
+        try:
+            self.rank_store.add(*entry)
+        except sqlite3.Error:
+            return False
+        return True
+
+    def on_score_sent(self, future: Future, entry: tuple[str, int, str, bytes | None]) -> None:
+        self.sending_scores.pop(future, None)
+        if future.exception() is not None:
+            self.store_score_locally(entry)
         self.refresh_rank_panel()
 
+    def watch_future(self, future: Future, callback: Callable[[Future], None]) -> None:
+        """작업 스레드의 결과를 프레임마다 확인해 Tk 스레드에서 callback으로 넘긴다."""
+
+        def poll(now: float) -> bool:
+            if not future.done():
+                return True
+            callback(future)
+            return False
+
+        self.frame_loop.add(f"future{next(self.future_ids)}", poll)
+
     def refresh_rank_panel(self) -> None:
-        rankings = self.load_rankings()
-        for item_id in self.rank_list.get_children():
-            self.rank_list.delete(item_id)
+        if self.leaderboard is None:
+            self.show_rankings(self.load_rankings())
+            return
+        # 늦게 도착한 예전 요청의 결과는 버린다.
+        self.rank_request += 1
+        request = self.rank_request
+        self.watch_future(self.leaderboard.top(10), lambda future: self.on_rankings_fetched(future, request))
 
-        if len(rankings) == 0:
-            self.rank_list.insert("", "end", values=("-", "기록 없음", "-"))
+    def on_rankings_fetched(self, future: Future, request: int) -> None:
+        if request != self.rank_request:
             return
+        if future.exception() is not None:
+            self.show_rankings(self.load_rankings())
+        else:
+            self.show_rankings(future.result())
 
+    def show_rankings(self, rankings: list[dict[str, str | int]]) -> None:
+        rows: list[tuple[int | str, str, int | str]] = []
         for idx, item in enumerate(rankings[:10], start=1):
             name = str(item.get("name", "Player"))[:14]
             score = int(item.get("score", 0))
-            self.rank_list.insert("", "end", values=(idx, name, score))
+            rows.append((idx, name, score))
+        if not rows:
+            rows.append(("-", "기록 없음", "-"))
+
+        # 순위 자리마다 행 하나를 고정해 두고 값이 바뀐 행만 고친다.
+        for idx, values in enumerate(rows):
+            iid = f"rank{idx}"
+            if idx >= len(self.rank_rows):
+                self.rank_list.insert("", "end", iid=iid, values=values)
+            elif self.rank_rows[idx] != values:
+                self.rank_list.item(iid, values=values)
+        for idx in range(len(rows), len(self.rank_rows)):
+            self.rank_list.delete(f"rank{idx}")
+        self.rank_rows = rows
+
+
+def default_save_path() -> Path | None:
+    """APPLE_SAVE로 저장 파일 경로를 바꾼다. off면 저장하지 않는다."""
+    value = os.environ.get("APPLE_SAVE")
+    if value == "off":
+        return None
+    return Path(value) if value else Path(__file__).resolve().parent / "autosave.apsv"
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="사과 박스 게임")
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--cols", type=int, default=17)
+    parser.add_argument("--replay", type=Path, default=None, help="다시 볼 기록 파일")
+    parser.add_argument("--replay-id", type=int, default=None, help="랭킹 DB에서 다시 볼 기록 번호")
+    parser.add_argument("--speed", type=float, default=1.0, help="리플레이 배속")
+    parser.add_argument("--new", action="store_true", help="저장한 게임을 이어 하지 않고 새로 시작")
+    args = parser.parse_args()
+
+    replay = None
+    if args.replay is not None or args.replay_id is not None:
+        if args.replay is not None:
+            data = args.replay.read_bytes()
+        else:
+            store = RankingStore(Path(__file__).resolve().parent / "rankings.sqlite3")
+            data = store.replay(args.replay_id)
+            store.close()
+        if data is None:
+            parser.error(f"no replay for id {args.replay_id}")
+        try:
+            replay = Replay.from_bytes(data)
+        except ValueError as exc:
+            parser.error(str(exc))
+        args.rows, args.cols = replay.rows, replay.cols
+
+    resume = None
+    autosaver = None
+    save_path = default_save_path() if replay is None else None
+    # 이미 다른 창이 저장 파일을 쓰고 있으면 이 창은 저장하지도 이어 하지도 않는다.
+    lock = lock_save(save_path) if save_path is not None else None
+    if save_path is not None and lock is not None:
+        autosaver = Autosaver(save_path, lock)
+        if not args.new:
+            resume = load_save(save_path)
+            if resume is not None:
+                args.rows, args.cols = resume.rows, resume.cols
+
     root = tk.Tk()
-    AppleBoxGame(root)
+    game = AppleBoxGame(root, rows=max(1, args.rows), cols=max(1, args.cols), resume=resume, autosaver=autosaver)
+    if replay is not None:
+        game.play_replay(replay, args.speed)
     root.mainloop()
 
 
@@ -0,0 +1,244 @@
+import threading
+import time
+import wave
+from collections import deque
+from pathlib import Path
+from typing import Protocol
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import sounddevice
+except ImportError:
+    sounddevice = None
+
+MIX_RATE = 44100
+# 한 번에 섞는 길이. 44.1kHz에서 약 5.8ms라 효과음이 늦어도 블록 하나 + 장치 버퍼만큼이다.
+BLOCK_FRAMES = 256
+
+
+class Sink(Protocol):
+    # write가 장치 재생 속도에 맞춰 기다리면 True, 바로 돌아오면 False(믹서가 직접 속도를 맞춘다).
+    blocking: bool
+
+    def write(self, samples: "np.ndarray") -> None: ...
+
+    def close(self) -> None: ...
+
+
+class NullSink:
+    """소리를 버리고 쓴 프레임 수만 센다. 디스플레이나 사운드 장치가 없는 환경용."""
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self.frames = 0
+
+    def write(self, samples: "np.ndarray") -> None:
+        self.frames += len(samples)
+
+    def close(self) -> None:
+        pass
+
+
+class WavSink:
+    """섞은 결과를 16비트 모노 WAV 파일로 남긴다."""
+
+    blocking = False
+
+    def __init__(self, path: Path, rate: int = MIX_RATE) -> None:
+        self.file = wave.open(str(path), "wb")
+        self.file.setnchannels(1)
+        self.file.setsampwidth(2)
+        self.file.setframerate(rate)
+        self.frames = 0
+
+    def write(self, samples: "np.ndarray") -> None:
+        self.file.writeframes(samples.tobytes())
+        self.frames += len(samples)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class DeviceSink:
+    """sounddevice 출력 스트림. write는 장치 버퍼에 자리가 날 때까지 기다린다."""
+
+    blocking = True
+
+    def __init__(self, rate: int = MIX_RATE, block: int = BLOCK_FRAMES) -> None:
+        self.stream = sounddevice.RawOutputStream(
+            samplerate=rate,
+            channels=1,
+            dtype="int16",
+            blocksize=block,
+            latency="low",
+        )
+        self.stream.start()
+
+    def write(self, samples: "np.ndarray") -> None:
+        self.stream.write(samples.tobytes())
+
+    def close(self) -> None:
+        self.stream.stop()
+        self.stream.close()
+
+
+def can_mix() -> bool:
+    return np is not None
+
+
+def open_sink(spec: str, rate: int = MIX_RATE, block: int = BLOCK_FRAMES) -> Sink | None:
+    """"device", "null", "wav:<경로>" 중 하나로 출력을 연다. 쓸 수 없으면 None."""
+    kind, _, arg = spec.partition(":")
+    if kind == "null":
+        return NullSink()
+    if kind == "wav" and arg:
+        try:
+            return WavSink(Path(arg), rate)
+        except OSError:
+            return None
+    if kind == "device" and sounddevice is not None:
+        try:
+            return DeviceSink(rate, block)
+        except Exception:
+            # PortAudio는 장치가 없을 때 자체 예외를 던진다.
+            return None
+    return None
+
+
+def load_wav(path: Path, rate: int = MIX_RATE) -> "np.ndarray":
+    """WAV를 -1..1 float32 모노로 읽고 믹서 샘플레이트에 맞춘다."""
+    with wave.open(str(path), "rb") as f:
+        channels = f.getnchannels()
+        width = f.getsampwidth()
+        source_rate = f.getframerate()
+        raw = f.readframes(f.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    else:
+        raise ValueError(f"unsupported sample width: {width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if source_rate != rate and len(samples):
+        count = int(round(len(samples) * rate / source_rate))
+        samples = np.interp(np.arange(count) * (source_rate / rate), np.arange(len(samples)), samples)
+    return samples.astype(np.float32)
+
+
+class Mixer:
+    """배경음 하나와 겹치는 효과음들을 백그라운드 스레드에서 섞어 출력에 보낸다.
+
+    play, start_loop, stop_loop는 명령을 큐에 넣기만 하므로 Tk 이벤트 루프를 막지 않는다.
+    음원은 load에서 한 번 디코딩해 메모리에 두고, 블록마다 numpy 배열 덧셈으로 섞는다.
+    """
+
+    def __init__(self, sink: Sink, rate: int = MIX_RATE, block: int = BLOCK_FRAMES) -> None:
+        self.sink = sink
+        self.rate = rate
+        self.block = block
+        self.sounds: dict[str, np.ndarray] = {}
+        self.commands: deque[tuple] = deque()
+        # 아래는 믹서 스레드에서만 건드린다. voice = [샘플, 위치, 음량]
+        self.voices: list[list] = []
+        self.started: list[float] = []
+        self.loop: np.ndarray | None = None
+        self.loop_pos = 0
+        self.loop_volume = 1.0
+        # 효과음을 요청한 뒤 첫 블록이 출력에 넘어가기까지 걸린 시간(초)
+        self.last_latency: float | None = None
+        self.running = False
+        self.thread: threading.Thread | None = None
+
+    def load(self, name: str, path: Path) -> bool:
+        try:
+            self.sounds[name] = load_wav(path, self.rate)
+        except (OSError, EOFError, ValueError, wave.Error):
+            return False
+        return True
+
+    def play(self, name: str, volume: float = 1.0) -> bool:
+        if name not in self.sounds:
+            return False
+        self.commands.append(("play", name, volume, time.perf_counter()))
+        return True
+
+    def start_loop(self, name: str, volume: float = 1.0) -> bool:
+        if name not in self.sounds:
+            return False
+        self.commands.append(("loop", name, volume, 0.0))
+        return True
+
+    def stop_loop(self) -> None:
+        self.commands.append(("stop", "", 0.0, 0.0))
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="apple-mixer", daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.sink.close()
+
+    def render(self, frames: int) -> "np.ndarray":
+        """명령을 반영하고 다음 frames개 샘플을 int16으로 섞어 돌려준다."""
+        while self.commands:
+            kind, name, volume, requested = self.commands.popleft()
+            if kind == "play":
+                self.voices.append([self.sounds[name], 0, volume])
+                self.started.append(requested)
+            elif kind == "loop":
+                self.loop = self.sounds[name]
+                self.loop_pos = 0
+                self.loop_volume = volume
+            else:
+                self.loop = None
+
+        out = np.zeros(frames, dtype=np.float32)
+        if self.loop is not None and len(self.loop):
+            idx = (self.loop_pos + np.arange(frames)) % len(self.loop)
+            out += self.loop[idx] * self.loop_volume
+            self.loop_pos = int(idx[-1] + 1) % len(self.loop)
+
+        alive: list[list] = []
+        for voice in self.voices:
+            samples, pos, volume = voice
+            chunk = samples[pos : pos + frames]
+            out[: len(chunk)] += chunk * volume
+            voice[1] = pos + len(chunk)
+            if voice[1] < len(samples):
+                alive.append(voice)
+        self.voices = alive
+
+        np.clip(out, -1.0, 1.0, out=out)
+        return (out * 32767).astype("<i2")
+
+    def _run(self) -> None:
+        period = self.block / self.rate
+        deadline = time.perf_counter()
+        while self.running:
+            data = self.render(self.block)
+            self.sink.write(data)
+            if self.started:
+                self.last_latency = time.perf_counter() - self.started[-1]
+                self.started.clear()
+            if not self.sink.blocking:
+                # 장치가 없는 출력은 실제 재생 속도에 맞춰 쉰다.
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    deadline = time.perf_counter()
@@ -0,0 +1,98 @@
+﻿import json
+import sqlite3
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    time TEXT NOT NULL,
+    replay BLOB
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class RankingStore:
+    """SQLite 기반 랭킹 저장소.
+
+    기록 추가는 트랜잭션 하나로 끝나므로 중간에 죽어도 파일이 깨지지 않고, 여러 게임이
+    같은 파일을 써도 서로의 기록을 덮어쓰지 않는다. 상위 N개는 점수 인덱스로 바로 읽는다.
+    공유 드라이브에서도 쓰도록 WAL 대신 기본 롤백 저널을 쓴다.
+    """
+
+    def __init__(self, db_path: Path, legacy_json: Path | None = None, timeout: float = 5.0) -> None:
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path), timeout=timeout)
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            # 기록(replay) 열이 생기기 전에 만든 파일에는 열만 더한다.
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(scores)")}
+            if "replay" not in columns:
+                self.conn.execute("ALTER TABLE scores ADD COLUMN replay BLOB")
+        if legacy_json is not None:
+            try:
+                self.migrate_json(legacy_json)
+            except sqlite3.Error:
+                # 옮기지 못해도 저장소는 쓴다. 다음에 열 때 다시 옮긴다.
+                pass
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def migrate_json(self, path: Path) -> int:
+        """예전 rankings.json 기록을 한 번만 옮긴다. 원본 파일은 건드리지 않는다."""
+        key = f"migrated:{path.name}"
+        with self.conn:
+            # 여러 게임이 같은 파일을 동시에 열어도 한쪽만 옮기도록 확인 전에 쓰기 잠금을 잡는다.
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                return 0
+            entries = []
+            if path.exists():
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                except (json.JSONDecodeError, OSError):
+                    data = []
+                if isinstance(data, list):
+                    for item in data:
+                        if not isinstance(item, dict):
+                            continue
+                        try:
+                            score = int(item.get("score", 0))
+                        except (TypeError, ValueError):
+                            continue
+                        entries.append((str(item.get("name", "Player"))[:20], score, str(item.get("time", ""))))
+            self.conn.executemany("INSERT INTO scores (name, score, time) VALUES (?, ?, ?)", entries)
+            self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", (key, str(len(entries))))
+        return len(entries)
+
+    def add(self, name: str, score: int, time: str, replay: bytes | None = None) -> int:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO scores (name, score, time, replay) VALUES (?, ?, ?, ?)",
+                (name, score, time, replay),
+            )
+        return int(cursor.lastrowid)
+
+    def add_many(self, entries: list[tuple[str, int, str, bytes | None]]) -> int:
+        """(name, score, time, replay) 여러 개를 트랜잭션 하나로 넣는다."""
+        with self.conn:
+            self.conn.executemany("INSERT INTO scores (name, score, time, replay) VALUES (?, ?, ?, ?)", entries)
+        return len(entries)
+
+    def replay(self, score_id: int) -> bytes | None:
+        row = self.conn.execute("SELECT replay FROM scores WHERE id = ?", (score_id,)).fetchone()
+        return row[0] if row else None
+
+    def top(self, limit: int = 10) -> list[dict[str, str | int]]:
+        rows = self.conn.execute(
+            "SELECT name, score, time FROM scores ORDER BY score DESC, id LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [{"name": name, "score": score, "time": time} for name, score, time in rows]
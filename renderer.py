@@ -0,0 +1,92 @@
+from typing import Any, Callable
+
+_MISSING = object()
+
+
+class NullBackend:
+    """캔버스 대신 받는 출력. 호출 수만 센다."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def itemconfig(self, item: int, **options: Any) -> None:
+        self.calls += 1
+
+    def coords(self, item: int, *coords: float) -> None:
+        self.calls += 1
+
+
+class RecordingBackend(NullBackend):
+    """받은 호출을 순서대로 남긴다. 화면 없이 렌더링 결과를 확인할 때 쓴다."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.ops: list[tuple[str, int, Any]] = []
+
+    def itemconfig(self, item: int, **options: Any) -> None:
+        super().itemconfig(item, **options)
+        self.ops.append(("itemconfig", item, options))
+
+    def coords(self, item: int, *coords: float) -> None:
+        super().coords(item, *coords)
+        self.ops.append(("coords", item, coords))
+
+
+class Renderer:
+    """캔버스 아이템 옵션을 모아 두었다가 한 프레임에 한 번 바뀐 것만 보낸다.
+
+    itemconfig와 coords는 원하는 값만 기록하고, flush에서 마지막으로 보낸 값과 비교해 달라진
+    옵션만 아이템당 호출 하나로 보낸다. 한 이벤트 안에서 숨겼다가 다시 보이는 식의 변경은
+    아무 호출도 만들지 않는다. 아이템 생성, 삭제, 쌓임 순서는 캔버스에 바로 한다.
+    """
+
+    def __init__(self, backend: Any, schedule: Callable[[Callable[[], None]], Any] | None = None) -> None:
+        self.backend = backend
+        # 보통 root.after_idle. None이면 flush를 직접 불러야 한다.
+        self.schedule = schedule
+        self.applied: dict[int, dict[str, Any]] = {}
+        self.pending: dict[int, dict[str, Any]] = {}
+        self.scheduled = False
+        self.frames = 0
+        self.sent = 0
+        self.skipped = 0
+
+    def itemconfig(self, item: int, **options: Any) -> None:
+        self.pending.setdefault(item, {}).update(options)
+        self._request()
+
+    def coords(self, item: int, *coords: float) -> None:
+        self.pending.setdefault(item, {})["coords"] = coords
+        self._request()
+
+    def forget(self, item: int) -> None:
+        """캔버스에서 지운 아이템의 기록을 버린다."""
+        self.applied.pop(item, None)
+        self.pending.pop(item, None)
+
+    def _request(self) -> None:
+        if not self.scheduled and self.schedule is not None:
+            self.scheduled = True
+            self.schedule(self.flush)
+
+    def flush(self) -> None:
+        self.scheduled = False
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        backend = self.backend
+        for item, options in pending.items():
+            applied = self.applied.setdefault(item, {})
+            changed = {key: value for key, value in options.items() if applied.get(key, _MISSING) != value}
+            if not changed:
+                self.skipped += 1
+                continue
+            applied.update(changed)
+            coords = changed.pop("coords", None)
+            if coords is not None:
+                backend.coords(item, *coords)
+                self.sent += 1
+            if changed:
+                backend.itemconfig(item, **changed)
+                self.sent += 1
+        self.frames += 1
@@ -0,0 +1,182 @@
+import argparse
+import os
+import random
+import sqlite3
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from engine import CLEAR_POINTS, Board, Game, normalize_rect
+from rankings import RankingStore
+
+MAGIC = b"APRP"
+VERSION = 1
+# magic, version, rows, cols, time_limit(초), seed, 수 개수
+HEADER = struct.Struct("<4sBHHHQI")
+# drag_start (r, c), drag_current (r, c), 게임 시간(ms)
+MOVE = struct.Struct("<HHHHI")
+
+# (start_r, start_c, current_r, current_c, t_ms)
+Move = tuple[int, int, int, int, int]
+
+
+@dataclass
+class Replay:
+    """한 판을 다시 만들 수 있는 기록. 보드는 seed로 다시 채우고, 수는 놓은 순서대로 둔다."""
+
+    seed: int
+    rows: int
+    cols: int
+    time_limit: int
+    moves: list[Move] = field(default_factory=list)
+
+    def record(self, start: tuple[int, int], current: tuple[int, int], t_ms: int) -> None:
+        self.moves.append((start[0], start[1], current[0], current[1], t_ms))
+
+    def new_board(self) -> Board:
+        return Board.random(self.rows, self.cols, random.Random(self.seed))
+
+    def to_bytes(self) -> bytes:
+        parts = [HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.time_limit, self.seed, len(self.moves))]
+        parts.extend(MOVE.pack(*move) for move in self.moves)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        try:
+            magic, version, rows, cols, time_limit, seed, count = HEADER.unpack_from(data)
+        except struct.error as exc:
+            raise ValueError("replay header is truncated") from exc
+        if magic != MAGIC:
+            raise ValueError("not a replay")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version: {version}")
+        if len(data) != HEADER.size + count * MOVE.size:
+            raise ValueError("replay length does not match its move count")
+        moves = list(MOVE.iter_unpack(data[HEADER.size :]))
+        return cls(seed, rows, cols, time_limit, moves)
+
+
+@dataclass
+class VerifyResult:
+    ok: bool
+    score: int
+    clears: int
+    moves: int
+    reason: str = ""
+
+
+def verify(replay: Replay, claimed_score: int | None = None) -> VerifyResult:
+    """기록을 처음부터 다시 두어 점수와 시간 제한을 확인한다."""
+    game = Game(replay.new_board())
+    limit_ms = replay.time_limit * 1000
+    last_t = 0
+
+    def fail(reason: str) -> VerifyResult:
+        return VerifyResult(False, game.score, game.clears, game.moves, reason)
+
+    for n, (sr, sc, cr, cc, t_ms) in enumerate(replay.moves, start=1):
+        if t_ms < last_t:
+            return fail(f"move {n}: time goes backwards")
+        if t_ms >= limit_ms:
+            return fail(f"move {n}: after the time limit")
+        last_t = t_ms
+        if max(sr, cr) >= replay.rows or max(sc, cc) >= replay.cols:
+            return fail(f"move {n}: outside the board")
+        # 빈 칸만 고른 드래그는 게임이 수로 치지 않으므로 기록에도 없어야 한다.
+        if game.play(normalize_rect((sr, sc), (cr, cc))) is None:
+            return fail(f"move {n}: empty selection")
+
+    if game.score != game.clears * CLEAR_POINTS:
+        return fail("score does not match clears")
+    if claimed_score is not None and claimed_score != game.score:
+        return fail(f"claimed {claimed_score}, replay gives {game.score}")
+    return VerifyResult(True, game.score, game.clears, game.moves)
+
+
+def verify_blob(data: bytes, claimed_score: int | None = None) -> VerifyResult:
+    try:
+        replay = Replay.from_bytes(data)
+    except ValueError as exc:
+        return VerifyResult(False, 0, 0, 0, str(exc))
+    return verify(replay, claimed_score)
+
+
+def _verify_star(item: tuple[bytes, int | None]) -> VerifyResult:
+    return verify_blob(*item)
+
+
+def verify_many(items: list[tuple[bytes, int | None]], workers: int | None = None) -> list[VerifyResult]:
+    """(기록, 주장 점수) 목록을 확인한다. workers가 1보다 크면 여러 프로세스로 나눈다."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) < 64:
+        return [verify_blob(data, score) for data, score in items]
+    chunk = max(16, len(items) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_verify_star, items, chunksize=chunk))
+
+
+def load_ranked_replays(db_path: Path) -> list[tuple[int, int, bytes]]:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute("SELECT id, score, replay FROM scores WHERE replay IS NOT NULL ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="게임 기록을 다시 두어 점수를 확인한다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("verify", help="기록 파일 확인")
+    check.add_argument("files", nargs="+", type=Path)
+    check.add_argument("--score", type=int, default=None, help="주장하는 점수")
+    audit = sub.add_parser("audit", help="랭킹 DB의 기록을 모두 확인")
+    audit.add_argument("db", type=Path)
+    audit.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    export = sub.add_parser("export", help="랭킹 DB의 기록 하나를 파일로 꺼냄")
+    export.add_argument("db", type=Path)
+    export.add_argument("id", type=int)
+    export.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        failed = 0
+        for path in args.files:
+            result = verify_blob(path.read_bytes(), args.score)
+            failed += not result.ok
+            status = "ok" if result.ok else f"FAIL ({result.reason})"
+            print(f"{path}: score {result.score}, {result.clears} clears, {result.moves} moves: {status}")
+        sys.exit(1 if failed else 0)
+
+    if args.command == "export":
+        # 없는 파일을 빈 DB로 만들지 않도록 먼저 확인한다.
+        if not args.db.exists():
+            sys.exit(f"{args.db}: no such file")
+        store = RankingStore(args.db)
+        try:
+            data = store.replay(args.id)
+        finally:
+            store.close()
+        if data is None:
+            sys.exit(f"no replay for id {args.id}")
+        args.output.write_bytes(data)
+        return
+
+    rows = load_ranked_replays(args.db)
+
+    start = time.perf_counter()
+    results = verify_many([(data, score) for _, score, data in rows], args.workers)
+    elapsed = time.perf_counter() - start
+    failed = [(row[0], result) for row, result in zip(rows, results) if not result.ok]
+    for row_id, result in failed:
+        print(f"id {row_id}: {result.reason}")
+    rate = len(rows) / elapsed if elapsed > 0 else 0.0
+    print(f"{len(rows)} replays, {len(failed)} failed, {rate:,.0f} replays/s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import atexit
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from replay import MOVE, Move, Replay
+
+MAGIC = b"APSV"
+VERSION = 1
+# magic, version, rows, cols, time_limit(초), seed, score, moves, 흐른 시간(초), flags, 기록된 수 개수
+HEADER = struct.Struct("<4sBHHHQIIdBI")
+CRC = struct.Struct("<I")
+FLAG_ASSISTED = 1
+
+
+def pack_values(values: bytes) -> bytes:
+    """칸 값(0~9)을 한 바이트에 두 개씩 담는다. 0은 지운 칸이다."""
+    if len(values) % 2:
+        values = bytes(values) + b"\0"
+    half = len(values) // 2
+    high = int.from_bytes(bytes(values[0::2]), "big") << 4
+    low = int.from_bytes(bytes(values[1::2]), "big")
+    return (high | low).to_bytes(half, "big")
+
+
+_HIGH = bytes(b >> 4 for b in range(256))
+_LOW = bytes(b & 0xF for b in range(256))
+
+
+def unpack_values(data: bytes, count: int) -> bytes:
+    values = bytearray(len(data) * 2)
+    values[0::2] = data.translate(_HIGH)
+    values[1::2] = data.translate(_LOW)
+    return bytes(values[:count])
+
+
+@dataclass
+class SaveState:
+    """이어 하기에 필요한 한 판의 상태. 보드는 지금 값 그대로 담아 다시 채우지 않고 바로 만든다.
+
+    다음 보드는 새 seed로 만들므로 따로 남길 난수 상태는 이 판의 seed뿐이다. 지금까지 둔 수도 함께
+    담아 이어 한 판의 기록도 처음부터 다시 확인할 수 있게 한다.
+    """
+
+    rows: int
+    cols: int
+    time_limit: int
+    seed: int
+    score: int
+    moves: int
+    elapsed: float
+    values: bytes
+    assisted: bool = False
+    replay_moves: list[Move] = field(default_factory=list)
+
+    def replay(self) -> Replay:
+        return Replay(self.seed, self.rows, self.cols, self.time_limit, list(self.replay_moves))
+
+    def to_bytes(self) -> bytes:
+        parts = [
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                self.rows,
+                self.cols,
+                self.time_limit,
+                self.seed,
+                self.score,
+                self.moves,
+                self.elapsed,
+                FLAG_ASSISTED if self.assisted else 0,
+                len(self.replay_moves),
+            ),
+            pack_values(self.values),
+        ]
+        parts.extend(MOVE.pack(*move) for move in self.replay_moves)
+        body = b"".join(parts)
+        return body + CRC.pack(zlib.crc32(body))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SaveState":
+        if len(data) < HEADER.size + CRC.size:
+            raise ValueError("save file is truncated")
+        body, (crc,) = data[: -CRC.size], CRC.unpack_from(data, len(data) - CRC.size)
+        if zlib.crc32(body) != crc:
+            raise ValueError("save file checksum mismatch")
+        magic, version, rows, cols, time_limit, seed, score, moves, elapsed, flags, count = HEADER.unpack_from(body)
+        if magic != MAGIC:
+            raise ValueError("not a save file")
+        if version != VERSION:
+            raise ValueError(f"unsupported save version: {version}")
+        cells = rows * cols
+        packed = (cells + 1) // 2
+        if len(body) != HEADER.size + packed + count * MOVE.size:
+            raise ValueError("save file length does not match its header")
+        values = unpack_values(body[HEADER.size : HEADER.size + packed], cells)
+        if max(values, default=0) > 9:
+            raise ValueError("save file has an invalid cell value")
+        replay_moves = list(MOVE.iter_unpack(body[HEADER.size + packed :]))
+        return cls(rows, cols, time_limit, seed, score, moves, elapsed, values, bool(flags & FLAG_ASSISTED), replay_moves)
+
+
+def load_save(path: Path) -> SaveState | None:
+    """저장 파일을 읽는다. 없거나 깨졌으면 None."""
+    try:
+        return SaveState.from_bytes(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    # 임시 파일에 다 쓰고 이름을 바꾸므로 도중에 죽어도 예전 저장은 남는다.
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def lock_save(path: Path) -> BinaryIO | None:
+    """저장 파일 옆 .lock 파일을 잠근다. 다른 창이 이미 잠갔으면 None.
+
+    잠금은 돌려준 파일을 닫거나 프로세스가 끝나면 OS가 푼다. 죽은 창이 남긴 .lock 파일은 문제가 되지 않는다.
+    """
+    try:
+        f = path.with_name(path.name + ".lock").open("a+b")
+    except OSError:
+        return None
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+_DELETE = object()
+
+
+class Autosaver:
+    """저장을 백그라운드 스레드에서 한다. 밀린 저장은 가장 최근 것 하나만 쓴다.
+
+    lock은 lock_save가 돌려준 잠금이다. 닫을 때 함께 풀어 다음 창이 이 저장을 이어받게 한다.
+    """
+
+    def __init__(self, path: Path, lock: BinaryIO | None = None) -> None:
+        self.path = path
+        self.lock = lock
+        self.cond = threading.Condition()
+        self.latest: SaveState | object | None = None
+        self.closing = False
+        self.saves = 0
+        self.errors = 0
+        self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def save(self, state: SaveState) -> None:
+        with self.cond:
+            self.latest = state
+            self.cond.notify()
+
+    def clear(self) -> None:
+        """저장 파일을 지운다. 끝난 판이나 새 판은 이어 하지 않는다."""
+        with self.cond:
+            self.latest = _DELETE
+            self.cond.notify()
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        atexit.unregister(self.close)
+        with self.cond:
+            self.closing = True
+            self.cond.notify()
+        self.thread.join(timeout)
+        if self.lock is not None:
+            self.lock.close()
+            self.lock = None
+
+    def run(self) -> None:
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.closing or self.latest is not None)
+                latest, self.latest = self.latest, None
+                closing = self.closing
+            try:
+                if latest is _DELETE:
+                    self.path.unlink(missing_ok=True)
+                elif isinstance(latest, SaveState):
+                    write_atomic(self.path, latest.to_bytes())
+                    self.saves += 1
+            except OSError:
+                self.errors += 1
+            if closing:
+                return
@@ -0,0 +1,162 @@
+﻿import argparse
+import random
+import time
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from engine import CLEAR_POINTS, TARGET_SUM, Board, Rect
+
+# 한 번 지울 때 최소 사과 수(9 이하 값으로 10을 만들려면 둘 이상)
+MIN_APPLES_PER_CLEAR = 2
+
+
+@dataclass
+class SolveStats:
+    nodes: int = 0
+    tt_lookups: int = 0
+    tt_hits: int = 0
+    tt_evictions: int = 0
+    tt_peak_entries: int = 0
+    peak_memory: int | None = None
+    elapsed: float = 0.0
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.tt_hits / self.tt_lookups if self.tt_lookups else 0.0
+
+
+@dataclass
+class Solution:
+    clears: int
+    moves: list[Rect]
+    stats: SolveStats
+
+    @property
+    def score(self) -> int:
+        return self.clears * CLEAR_POINTS
+
+
+def upper_bound(board: Board) -> int:
+    return min(board.mass // TARGET_SUM, board.live // MIN_APPLES_PER_CLEAR)
+
+
+class Solver:
+    """작은 보드에서 지울 수 있는 최대 횟수를 정확히 구한다.
+
+    분기 한정 탐색에 조브리스트 해시 전치표를 붙였다. 지운 순서만 다른 수열은 같은
+    보드에 도달하므로 전치표가 탐색량을 크게 줄인다. 전치표는 max_entries를 넘으면
+    가장 오래 쓰지 않은 항목부터 버린다.
+    """
+
+    def __init__(self, board: Board, max_entries: int = 1_000_000, seed: int = 0) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.board = board.copy()
+        self.max_entries = max_entries
+        rng = random.Random(seed)
+        # 각 칸의 값은 처음부터 고정이므로 칸마다 키 하나면 상태를 구분할 수 있다.
+        self.keys = [rng.getrandbits(64) for _ in range(board.rows * board.cols)]
+        self.table: OrderedDict[int, int] = OrderedDict()
+        self.stats = SolveStats()
+
+    def solve(self, trace_memory: bool = False) -> Solution:
+        self.table.clear()
+        self.stats = SolveStats()
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            clears = self._search(self.board, 0)
+            moves = self._principal_line(clears)
+        finally:
+            self.stats.elapsed = time.perf_counter() - start
+            if trace_memory:
+                self.stats.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        return Solution(clears=clears, moves=moves, stats=self.stats)
+
+    def _child(self, board: Board, key: int, move: Rect) -> tuple[Board, int]:
+        cells = board.select(move)
+        child = board.copy()
+        child.remove(cells)
+        for i in cells:
+            key ^= self.keys[i]
+        return child, key
+
+    def _search(self, board: Board, key: int) -> int:
+        stats = self.stats
+        table = self.table
+        stats.nodes += 1
+        stats.tt_lookups += 1
+        cached = table.get(key)
+        if cached is not None:
+            stats.tt_hits += 1
+            table.move_to_end(key)
+            return cached
+
+        best = 0
+        bound = upper_bound(board)
+        if bound:
+            # 적게 지우는 수부터 보면 좋은 해를 빨리 찾아 가지치기가 잘 된다.
+            moves = sorted(board.find_moves(), key=lambda m: len(board.select(m)))
+            for move in moves:
+                if best >= bound:
+                    break
+                child, child_key = self._child(board, key, move)
+                if 1 + upper_bound(child) <= best:
+                    continue
+                value = 1 + self._search(child, child_key)
+                if value > best:
+                    best = value
+
+        table[key] = best
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
+            stats.tt_evictions += 1
+        elif len(table) > stats.tt_peak_entries:
+            stats.tt_peak_entries = len(table)
+        return best
+
+    def _principal_line(self, clears: int) -> list[Rect]:
+        board, key = self.board, 0
+        moves: list[Rect] = []
+        while clears:
+            for move in board.find_moves():
+                child, child_key = self._child(board, key, move)
+                if 1 + self._search(child, child_key) == clears:
+                    moves.append(move)
+                    board, key = child, child_key
+                    clears -= 1
+                    break
+        return moves
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="작은 보드의 최대 점수를 정확히 구한다.")
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-entries", type=int, default=1_000_000)
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    board = Board.random(args.rows, args.cols, random.Random(args.seed))
+    solution = Solver(board, max_entries=args.max_entries).solve(trace_memory=args.trace_memory)
+    stats = solution.stats
+    print(f"max clears {solution.clears} (score {solution.score})")
+    print(f"nodes {stats.nodes:,} in {stats.elapsed:.2f}s ({stats.nodes_per_sec:,.0f} nodes/s)")
+    print(
+        f"table hit rate {stats.hit_rate:.1%}, peak entries {stats.tt_peak_entries:,}, "
+        f"evictions {stats.tt_evictions:,}"
+    )
+    if stats.peak_memory is not None:
+        print(f"peak memory {stats.peak_memory / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+﻿import base64
+import io
+import tkinter as tk
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = None
+
+# 잎과 그림자가 칸 밖으로 조금 나가므로 스프라이트는 칸보다 여백만큼 크게 만든다.
+SPRITE_PAD = 8
+FONT_FILES = ("arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf")
+OUTLINE_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+
+
+def apple_colors(light: bool) -> tuple[str, str]:
+    body = "#ff4a3d" if light else "#ef3f33"
+    edge = "#e73a2e" if light else "#cc3027"
+    return body, edge
+
+
+class SpriteCache:
+    """숫자(1-9), 테마, 칸 크기마다 사과 그림 한 장을 미리 그려 둔다.
+
+    캔버스 아이템은 숫자별 표시용 이미지(display)를 가리킨다. 테마를 바꿀 때는 그 아홉 장에
+    다른 테마의 그림을 복사해 넣을 뿐이라 보드 크기와 상관없이 비용이 같다.
+    Pillow가 없으면 available이 False이고, 게임은 기존처럼 도형 아이템으로 그린다.
+    """
+
+    def __init__(self, root: tk.Tk, cell_size: int, font_px: int, light: bool = True) -> None:
+        self.root = root
+        self.cell_size = cell_size
+        self.font_px = font_px
+        self.light = light
+        self.images: dict[tuple[int, bool, int], tk.PhotoImage] = {}
+        self.displays: dict[int, tk.PhotoImage] = {}
+        self.font = self._load_font() if Image is not None else None
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def get(self, value: int, light: bool) -> tk.PhotoImage:
+        key = (value, light, self.cell_size)
+        image = self.images.get(key)
+        if image is None:
+            image = self._render(value, light)
+            self.images[key] = image
+        return image
+
+    def display(self, value: int) -> tk.PhotoImage:
+        image = self.displays.get(value)
+        if image is None:
+            source = self.get(value, self.light)
+            image = tk.PhotoImage(master=self.root, width=source.width(), height=source.height())
+            image.tk.call(image.name, "copy", source.name, "-compositingrule", "set")
+            self.displays[value] = image
+        return image
+
+    def set_theme(self, light: bool) -> None:
+        if light == self.light:
+            return
+        self.light = light
+        for value, image in self.displays.items():
+            # 기본 규칙(overlay)은 반투명 픽셀을 이전 테마 위에 겹치므로 픽셀을 통째로 바꾼다.
+            image.tk.call(image.name, "copy", self.get(value, light).name, "-compositingrule", "set")
+
+    def _load_font(self) -> "ImageFont.ImageFont":
+        for name in FONT_FILES:
+            try:
+                return ImageFont.truetype(name, self.font_px)
+            except OSError:
+                continue
+        try:
+            return ImageFont.load_default(self.font_px)
+        except TypeError:
+            return ImageFont.load_default()
+
+    def _render(self, value: int, light: bool) -> tk.PhotoImage:
+        # make_cell의 도형 좌표를 그대로 옮겼다. (x, y)는 스프라이트 안에서 칸의 왼쪽 위.
+        size = self.cell_size + SPRITE_PAD * 2
+        image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        body, edge = apple_colors(light)
+
+        x = y = SPRITE_PAD
+        margin = 5
+        x1 = x + margin
+        y1 = y + margin
+        x2 = x + self.cell_size - margin
+        y2 = y + self.cell_size - margin
+
+        draw.ellipse((x1 + 1, y1 + 3, x2 + 1, y2 + 3), fill="#d7352c")
+        draw.ellipse((x1, y1, x2, y2), fill=body, outline=edge, width=2)
+        draw.ellipse((x1 + 1, y1 + 1, x2 - 1, y2 - 1), outline="#ffb4ab", width=1)
+        # Tk 각도는 반시계, Pillow 각도는 시계 방향이다. (start=220, extent=115)
+        draw.chord((x1 + 1, y1 + 9, x2 - 1, y2 - 1), start=360 - 335, end=360 - 220, fill="#de3228")
+
+        cx = (x1 + x2) / 2
+        draw.line((cx, y1 + 2, cx - 1, y1 - 5), fill="#6b3f1f", width=3)
+        draw.ellipse((cx + 2, y1 - 8, cx + 14, y1 + 2), fill="#3ddb99", outline="#14ad74", width=1)
+
+        tx = int((x1 + x2) / 2)
+        ty = int((y1 + y2) / 2) + 1
+        text = str(value)
+        for ox, oy in OUTLINE_OFFSETS:
+            draw.text((tx + ox, ty + oy), text, font=self.font, fill="#cf3f0a", anchor="mm")
+        draw.text((tx, ty), text, font=self.font, fill="white", anchor="mm")
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return tk.PhotoImage(master=self.root, data=base64.b64encode(buffer.getvalue()))
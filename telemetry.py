@@ -0,0 +1,333 @@
+import argparse
+import atexit
+import os
+import struct
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+MAGIC = b"APTL"
+VERSION = 1
+HEADER = struct.Struct("<4sB")
+# kind, session, elapsed_ms, a, b, c, d, e. 종류마다 a~e의 뜻이 다르다.
+#   START: a=처음 둘 수 있는 수, b=제한 시간(초), c=행, d=열
+#   HIT/MISS: a=직전 수와의 간격(ms), b=둔 뒤 남은 수, c=선택 넓이, d=선택한 사과 수, e=합
+#   END: a=점수, b=둔 횟수, d=끝난 이유(REASONS)
+RECORD = struct.Struct("<BQIIIIHH")
+START, HIT, MISS, END = range(4)
+REASONS = ("unknown", "timeout", "no_moves", "abandoned")
+TIMEOUT, NO_MOVES, ABANDONED = 1, 2, 3
+SUFFIX = ".aptl"
+U16 = 0xFFFF
+U32 = 0xFFFFFFFF
+
+
+class TelemetryWriter:
+    """게임 기록을 메모리에 모았다가 백그라운드 스레드가 파일 끝에 덧붙인다.
+
+    write는 레코드를 묶어 목록에 넣기만 하므로 Tk 스레드는 디스크를 기다리지 않는다. 파일이
+    max_bytes를 넘으면 다음 START에서 새 파일로 넘어가므로 한 판은 언제나 한 파일 안에 있다.
+    쓰기 스레드가 밀려 max_pending을 넘으면 새 레코드를 버리고 dropped만 센다.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 32 << 20,
+        flush_interval: float = 1.0,
+        max_pending: int = 1 << 16,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: list[bytes] = []
+        self.cond = threading.Condition()
+        self.closing = False
+        self.file: BinaryIO | None = None
+        self.size = 0
+        self.files = 0
+        self.dropped = 0
+        self.errors = 0
+        self.thread = threading.Thread(target=self.run, name="telemetry", daemon=True)
+        self.thread.start()
+        # 창을 닫지 않고 끝나도 모아 둔 기록은 쓴다.
+        atexit.register(self.close)
+
+    def write(self, kind: int, session: int, elapsed_ms: int, a: int = 0, b: int = 0, c: int = 0, d: int = 0, e: int = 0) -> None:
+        record = RECORD.pack(
+            kind,
+            session,
+            min(elapsed_ms, U32),
+            min(a, U32),
+            min(b, U32),
+            min(c, U32),
+            min(d, U16),
+            min(e, U16),
+        )
+        with self.cond:
+            if self.closing or len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self.pending.append(record)
+            if len(self.pending) >= self.max_pending // 2:
+                self.cond.notify()
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        atexit.unregister(self.close)
+        with self.cond:
+            self.closing = True
+            self.cond.notify()
+        self.thread.join(timeout)
+
+    def run(self) -> None:
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.closing or len(self.pending) >= self.max_pending // 2, self.flush_interval)
+                batch, self.pending = self.pending, []
+                closing = self.closing
+            if batch:
+                try:
+                    self.append(batch)
+                except OSError:
+                    self.errors += 1
+                    self.close_file()
+            if closing:
+                break
+        self.close_file()
+
+    def append(self, batch: list[bytes]) -> None:
+        for record in batch:
+            if self.file is None or (record[0] == START and self.size >= self.max_bytes):
+                self.open_file()
+            assert self.file is not None
+            self.file.write(record)
+            self.size += RECORD.size
+        assert self.file is not None
+        self.file.flush()
+
+    def open_file(self) -> None:
+        self.close_file()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"telemetry-{stamp}-{os.getpid()}-{self.files}{SUFFIX}"
+        self.file = path.open("ab")
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.size = HEADER.size
+        self.files += 1
+
+    def close_file(self) -> None:
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                self.errors += 1
+            self.file = None
+
+
+def read_records(path: Path, chunk_records: int = 1 << 16) -> Iterator[tuple[int, ...]]:
+    """레코드를 덩어리로 읽어 하나씩 돌려준다. 마지막에 덜 쓰인 레코드는 버린다."""
+    with path.open("rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        magic, version = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a telemetry v{VERSION} file")
+        size = RECORD.size * chunk_records
+        while chunk := f.read(size):
+            usable = len(chunk) - len(chunk) % RECORD.size
+            yield from RECORD.iter_unpack(memoryview(chunk)[:usable])
+
+
+class Histogram:
+    """정수 값별 개수. 값의 범위만큼만 메모리를 쓰고 합칠 수 있다."""
+
+    def __init__(self) -> None:
+        self.counts: Counter[int] = Counter()
+        self.count = 0
+
+    def add(self, value: int) -> None:
+        self.counts[value] += 1
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts.update(other.counts)
+        self.count += other.count
+
+    def percentiles(self, *points: float) -> list[int]:
+        if not self.count:
+            return [0 for _ in points]
+        targets = sorted((min(self.count, max(1, round(self.count * p / 100))), i) for i, p in enumerate(points))
+        result = [0] * len(points)
+        seen = 0
+        pos = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            while pos < len(targets) and targets[pos][0] <= seen:
+                result[targets[pos][1]] = value
+                pos += 1
+        return result
+
+
+@dataclass
+class Session:
+    session: int
+    initial_moves: int = 0
+    time_limit: int = 0
+    rows: int = 0
+    cols: int = 0
+    hits: int = 0
+    misses: int = 0
+    score: int = 0
+    elapsed_ms: int = 0
+    reason: str = "unfinished"
+
+    def csv(self) -> str:
+        return (
+            f"{self.session},{self.rows},{self.cols},{self.time_limit},{self.initial_moves},"
+            f"{self.hits},{self.misses},{self.score},{self.elapsed_ms},{self.reason}\n"
+        )
+
+
+SESSION_CSV_HEADER = "session,rows,cols,time_limit,initial_moves,hits,misses,score,elapsed_ms,reason\n"
+
+
+@dataclass
+class Summary:
+    records: int = 0
+    sessions: int = 0
+    reasons: Counter[str] = field(default_factory=Counter)
+    # 수마다: hit_dt_ms, miss_dt_ms, area, apples, remaining. 판마다: score, elapsed_ms, moves, hit_pct, initial_moves.
+    histograms: dict[str, Histogram] = field(default_factory=dict)
+
+    def hist(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def merge(self, other: "Summary") -> None:
+        self.records += other.records
+        self.sessions += other.sessions
+        self.reasons.update(other.reasons)
+        for name, histogram in other.histograms.items():
+            self.hist(name).merge(histogram)
+
+    def finish(self, session: Session) -> None:
+        self.sessions += 1
+        self.reasons[session.reason] += 1
+        moves = session.hits + session.misses
+        self.hist("session_score").add(session.score)
+        self.hist("session_elapsed_ms").add(session.elapsed_ms)
+        self.hist("session_moves").add(moves)
+        self.hist("session_hit_pct").add(session.hits * 100 // moves if moves else 0)
+        self.hist("session_initial_moves").add(session.initial_moves)
+
+
+def analyze_file(path: Path, sessions_path: Path | None = None) -> Summary:
+    """파일 하나를 훑어 요약한다. 메모리에는 끝나지 않은 판만 둔다."""
+    summary = Summary()
+    open_sessions: dict[int, Session] = {}
+    out = sessions_path.open("w", encoding="utf-8") if sessions_path is not None else None
+    hit_dt, miss_dt = summary.hist("hit_dt_ms"), summary.hist("miss_dt_ms")
+    area, apples, remaining = summary.hist("area"), summary.hist("apples"), summary.hist("remaining")
+    try:
+        for kind, session_id, elapsed_ms, a, b, c, d, _e in read_records(path):
+            summary.records += 1
+            session = open_sessions.get(session_id)
+            if session is None:
+                session = open_sessions[session_id] = Session(session_id)
+            if kind == START:
+                session.initial_moves, session.time_limit, session.rows, session.cols = a, b, c, d
+            elif kind == HIT or kind == MISS:
+                if kind == HIT:
+                    session.hits += 1
+                    hit_dt.add(a)
+                    remaining.add(b)
+                else:
+                    session.misses += 1
+                    miss_dt.add(a)
+                area.add(c)
+                apples.add(d)
+                session.elapsed_ms = elapsed_ms
+            elif kind == END:
+                session.score = a
+                session.elapsed_ms = elapsed_ms
+                session.reason = REASONS[d] if d < len(REASONS) else REASONS[0]
+                del open_sessions[session_id]
+                summary.finish(session)
+                if out is not None:
+                    out.write(session.csv())
+        for session in open_sessions.values():
+            summary.finish(session)
+            if out is not None:
+                out.write(session.csv())
+    finally:
+        if out is not None:
+            out.close()
+    return summary
+
+
+def _analyze_star(args: tuple[Path, Path | None]) -> Summary:
+    return analyze_file(*args)
+
+
+def collect_files(paths: list[Path]) -> list[Path]:
+    files: list[Path] = []
+    for path in paths:
+        files.extend(sorted(path.glob(f"*{SUFFIX}")) if path.is_dir() else [path])
+    return files
+
+
+def analyze(files: list[Path], workers: int | None = None, sessions_path: Path | None = None) -> Summary:
+    """파일마다 따로 요약해 합친다. workers가 1보다 크면 파일을 여러 프로세스에 나눈다."""
+    workers = workers or os.cpu_count() or 1
+    parts = [sessions_path.with_name(f"{sessions_path.name}.{i}.part") if sessions_path else None for i in range(len(files))]
+    jobs = list(zip(files, parts))
+    if workers <= 1 or len(files) <= 1:
+        results = [_analyze_star(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            results = list(executor.map(_analyze_star, jobs))
+    total = Summary()
+    for result in results:
+        total.merge(result)
+    if sessions_path is not None:
+        with sessions_path.open("w", encoding="utf-8") as out:
+            out.write(SESSION_CSV_HEADER)
+            for part in parts:
+                assert part is not None
+                with part.open("r", encoding="utf-8") as f:
+                    while chunk := f.read(1 << 20):
+                        out.write(chunk)
+                part.unlink()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="게임 기록(telemetry)을 요약한다.")
+    parser.add_argument("paths", nargs="+", type=Path, help="기록 파일이나 폴더")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sessions", type=Path, default=None, help="판별 요약을 쓸 CSV")
+    args = parser.parse_args()
+
+    files = collect_files(args.paths)
+    start = time.perf_counter()
+    summary = analyze(files, args.workers, args.sessions)
+    elapsed = time.perf_counter() - start
+    print(f"{len(files)} files, {summary.records:,} records, {summary.sessions:,} sessions in {elapsed:.2f}s")
+    print(f"{'metric':<22}{'count':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for name, histogram in summary.histograms.items():
+        p50, p90, p99, top = histogram.percentiles(50, 90, 99, 100)
+        print(f"{name:<22}{histogram.count:>10}{p50:>10}{p90:>10}{p99:>10}{top:>10}")
+    for reason, count in summary.reasons.most_common():
+        print(f"end {reason}: {count}")
+
+
+if __name__ == "__main__":
+    main()
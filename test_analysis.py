@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+import pytest
+
+from analysis import analyse_boards, boards_to_array, random_boards
+from engine import TARGET_SUM, Board
+
+
+def expected(board: Board) -> tuple[int, list[int], list[list[bool]]]:
+    """Board.find_moves로 개수, 지우는 사과 수별 개수, 덮인 칸을 구한다."""
+    sizes = [0] * (TARGET_SUM + 1)
+    playable = [[False] * board.cols for _ in range(board.rows)]
+    moves = list(board.find_moves())
+    for r1, c1, r2, c2 in moves:
+        sizes[board.count((r1, c1, r2, c2))] += 1
+        for r in range(r1, r2 + 1):
+            for c in range(c1, c2 + 1):
+                playable[r][c] = True
+    return len(moves), sizes, playable
+
+
+def check(boards: list[Board]) -> None:
+    result = analyse_boards(boards_to_array(boards))
+    for n, board in enumerate(boards):
+        count, sizes, playable = expected(board)
+        assert result.counts[n] == count
+        assert bool(result.dead[n]) == (count == 0)
+        assert result.size_counts[n].tolist() == sizes
+        assert result.playable[n].tolist() == playable
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_full_boards_match_find_moves(seed: int) -> None:
+    rng = random.Random(seed)
+    rows, cols = rng.randint(1, 10), rng.randint(1, 17)
+    check([Board.random(rows, cols, rng) for _ in range(20)])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sparse_boards_match_find_moves(seed: int) -> None:
+    rng = random.Random(seed)
+    rows, cols = rng.randint(1, 8), rng.randint(1, 9)
+    empty = rng.random()
+    boards = [
+        Board(rows, cols, bytes(0 if rng.random() < empty else rng.randint(1, 9) for _ in range(rows * cols)))
+        for _ in range(20)
+    ]
+    check(boards)
+
+
+def test_random_boards_round_trip() -> None:
+    array = random_boards(4, 3, 5, seed=1)
+    assert array.shape == (4, 3, 5) and array.min() >= 1 and array.max() <= 9
+    check([Board(3, 5, bytes(board.ravel())) for board in array])
+
+
+def test_rejects_bad_shape() -> None:
+    with pytest.raises(ValueError):
+        analyse_boards(np.zeros((3, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        boards_to_array([])
@@ -0,0 +1,129 @@
+import random
+
+import pytest
+
+from engine import TARGET_SUM, Board, Game, History, MoveIndex, RectSums, scan_moves
+from replay import Replay, verify, verify_blob
+from savegame import SaveState
+
+
+def brute_moves(board: Board) -> set[tuple[int, int, int, int]]:
+    """모든 사각형을 훑어 합이 10이고 네 변에 모두 사과가 있는 것을 고른다."""
+    found = set()
+    for r1 in range(board.rows):
+        for r2 in range(r1, board.rows):
+            for c1 in range(board.cols):
+                for c2 in range(c1, board.cols):
+                    rect = (r1, c1, r2, c2)
+                    if board.rect_sum(rect) != TARGET_SUM:
+                        continue
+                    top = any(board.value(r1, c) for c in range(c1, c2 + 1))
+                    bottom = any(board.value(r2, c) for c in range(c1, c2 + 1))
+                    left = any(board.value(r, c1) for r in range(r1, r2 + 1))
+                    right = any(board.value(r, c2) for r in range(r1, r2 + 1))
+                    if top and bottom and left and right:
+                        found.add(rect)
+    return found
+
+
+def random_board(rng: random.Random, rows: int, cols: int, empty: float = 0.3) -> Board:
+    return Board(rows, cols, bytes(0 if rng.random() < empty else rng.randint(1, 9) for _ in range(rows * cols)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_find_moves_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    board = random_board(rng, rng.randint(1, 8), rng.randint(1, 9))
+    assert set(board.find_moves()) == brute_moves(board)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_move_index_under_remove_and_restore(seed: int) -> None:
+    rng = random.Random(seed)
+    board = Board.random(7, 9, rng)
+    index = MoveIndex(board)
+    sums = RectSums(board)
+    history = History()
+    for _ in range(60):
+        if index and rng.random() < 0.7:
+            rect = rng.choice(sorted(index))
+            cells = board.select(rect)
+            history.push(board, cells)
+            for i in cells:
+                sums.add(i // board.cols, i % board.cols, -board.values[i])
+            rescan = rng.random() < 0.5
+            changed = index.remove(cells, rescan=rescan)
+            if not rescan:
+                index.merge(scan_moves(board.rows, board.cols, bytes(board.values), [changed]))
+        else:
+            restored = history.undo()
+            if restored is None:
+                continue
+            for i, value in restored:
+                sums.add(i // board.cols, i % board.cols, value)
+            index.restore(restored)
+        assert set(index) == brute_moves(board)
+        rect = (rng.randrange(board.rows), rng.randrange(board.cols), board.rows - 1, board.cols - 1)
+        assert sums.query(rect) == board.rect_sum(rect)
+    assert board.live == board.rows * board.cols - board.values.count(0)
+    assert board.mass == sum(board.values)
+
+
+def test_history_undo_redo_round_trip() -> None:
+    board = Board.random(10, 17, random.Random(3))
+    original = bytes(board.values)
+    index = MoveIndex(board)
+    history = History()
+    for _ in range(5):
+        cells = board.select(min(index))
+        history.push(board, cells)
+        index.remove(cells)
+    cleared = bytes(board.values)
+    while (restored := history.undo()) is not None:
+        index.restore(restored)
+    assert bytes(board.values) == original
+    while (cells := history.redo()) is not None:
+        index.remove(cells)
+    assert bytes(board.values) == cleared
+    assert history.nbytes < 1024
+
+
+@pytest.mark.parametrize("rows, cols", [(10, 17), (3, 3), (1, 1)])
+def test_save_state_round_trip(rows: int, cols: int) -> None:
+    rng = random.Random(rows * cols)
+    values = bytes(rng.randint(0, 9) for _ in range(rows * cols))
+    state = SaveState(rows, cols, 120, 12345, 50, 7, 12.3456789, values, True, [(0, 0, 1, 1, 500)])
+    assert SaveState.from_bytes(state.to_bytes()) == state
+
+
+def test_save_state_rejects_corruption() -> None:
+    state = SaveState(2, 3, 120, 1, 0, 0, 0.0, bytes(6))
+    data = bytearray(state.to_bytes())
+    data[10] ^= 1
+    with pytest.raises(ValueError):
+        SaveState.from_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        SaveState.from_bytes(state.to_bytes()[:-1])
+
+
+def play_recorded(seed: int) -> tuple[Replay, int]:
+    replay = Replay(seed, 10, 17, 120)
+    game = Game(replay.new_board())
+    index = MoveIndex(game.board)
+    t = 0
+    while index:
+        r1, c1, r2, c2 = min(index)
+        t += 700
+        replay.record((r2, c2), (r1, c1), t)
+        game.play((r1, c1, r2, c2))
+        index.rebuild()
+    return replay, game.score
+
+
+def test_replay_verifies_and_round_trips() -> None:
+    replay, score = play_recorded(7)
+    data = replay.to_bytes()
+    assert Replay.from_bytes(data) == replay
+    assert verify(replay, score).ok
+    assert not verify_blob(data, score + 10).ok
+    assert not verify_blob(data[:-1]).ok
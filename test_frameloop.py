@@ -0,0 +1,129 @@
+import pytest
+
+from fake_tk import Tk
+from frameloop import FrameLoop, PlayClock
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_play_clock_banks_paused_time() -> None:
+    clock = FakeClock()
+    play = PlayClock(clock)
+    clock.now = 5.0
+    assert play.elapsed() == 0.0 and not play.running
+    play.start()
+    clock.now = 7.5
+    assert play.elapsed() == pytest.approx(2.5)
+    play.pause()
+    clock.now = 100.0
+    assert play.elapsed() == pytest.approx(2.5)
+    play.start()
+    play.start()  # 이미 도는 중이면 시작 시각을 바꾸지 않는다.
+    clock.now = 101.0
+    assert play.elapsed() == pytest.approx(3.5)
+    play.reset(40.0)
+    assert play.elapsed() == 40.0 and not play.running
+    play.start()
+    clock.now = 102.0
+    assert play.elapsed() == pytest.approx(41.0)
+
+
+def test_play_clock_does_not_drift() -> None:
+    # 몇 번을 읽든, 얼마나 자주 멈췄다 가든 흐른 시간은 시계 차이의 합과 같다.
+    clock = FakeClock()
+    play = PlayClock(clock)
+    running = 0.0
+    for step in range(1000):
+        play.start()
+        clock.now += 0.0123
+        running += 0.0123
+        play.elapsed()
+        if step % 3 == 0:
+            play.pause()
+            clock.now += 1.0
+    assert play.elapsed() == pytest.approx(running, abs=1e-9)
+
+
+def make_loop(frame_ms: int = 16) -> tuple[Tk, FrameLoop]:
+    root = Tk()
+    return root, FrameLoop(root, frame_ms=frame_ms, clock=lambda: root.now)
+
+
+def test_frames_stay_on_grid_and_stop_when_idle() -> None:
+    root, loop = make_loop(10)
+    seen: list[float] = []
+
+    def task(now: float) -> bool:
+        seen.append(now)
+        return len(seen) < 50
+
+    loop.add("task", task)
+    root.advance(2.0)
+    assert len(seen) == 50
+    assert [round(t * 1000) for t in seen] == list(range(0, 500, 10))
+    assert loop.frames == 50 and loop.dropped == 0
+    # 할 일이 없으면 예약을 남기지 않는다.
+    assert loop.job is None and root.jobs == {}
+
+
+def test_requests_run_once_per_frame() -> None:
+    root, loop = make_loop()
+    calls: list[str] = []
+    for _ in range(5):
+        loop.request("a", lambda: calls.append("a"))
+    loop.request("b", lambda: calls.append("b"))
+    loop.request("c", lambda: calls.append("c"))
+    loop.cancel("c")
+    assert len(root.jobs) == 1
+    root.advance(0.1)
+    assert calls == ["a", "b"]
+
+    # 프레임 안에서 온 요청은 다음 프레임에 돈다.
+    def again() -> None:
+        calls.append("again")
+        if calls.count("again") < 3:
+            loop.request("again", again)
+
+    loop.request("again", again)
+    root.advance(0.1)
+    assert calls.count("again") == 3
+
+
+def test_slow_frames_skip_instead_of_catching_up() -> None:
+    root, loop = make_loop(10)
+    seen: list[float] = []
+
+    def slow(now: float) -> bool:
+        seen.append(now)
+        root.now += 0.035  # 프레임 셋 반 만큼 걸린다.
+        return len(seen) < 5
+
+    loop.add("slow", slow)
+    root.advance(1.0)
+    assert len(seen) == 5
+    assert loop.dropped > 0 and loop.overruns == 5
+    # 건너뛰어도 프레임 시각은 처음 격자에 맞는다.
+    assert all(round(t * 1000) % 10 == 0 for t in seen)
+    assert all(b - a < 0.05 for a, b in zip(seen, seen[1:]))
+
+
+def test_stop_and_remove() -> None:
+    root, loop = make_loop()
+    ticks: list[float] = []
+    loop.add("tick", lambda now: ticks.append(now) is None)
+    root.advance(0.05)
+    loop.remove("tick")
+    count = len(ticks)
+    root.advance(0.1)
+    assert len(ticks) == count
+    loop.add("tick", lambda now: ticks.append(now) is None)
+    loop.request("once", lambda: ticks.append(-1.0))
+    loop.stop()
+    root.advance(0.1)
+    assert len(ticks) == count and loop.tasks == {} and loop.pending == {}
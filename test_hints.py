@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from engine import Board, MoveIndex
+from hints import HintEngine
+
+
+def random_board(rng: random.Random, rows: int, cols: int) -> Board:
+    return Board(rows, cols, bytes(0 if rng.random() < 0.3 else rng.randint(1, 9) for _ in range(rows * cols)))
+
+
+def brute_conflicts(moves: list[tuple[int, int, int, int]], rect: tuple[int, int, int, int]) -> int:
+    """rect 안의 칸마다 그 칸을 덮는 다른 수를 센다."""
+    r1, c1, r2, c2 = rect
+    total = 0
+    for r in range(r1, r2 + 1):
+        for c in range(c1, c2 + 1):
+            total += sum(1 for m in moves if m[0] <= r <= m[2] and m[1] <= c <= m[3]) - 1
+    return total
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_conflicts_match_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    board = random_board(rng, rng.randint(1, 8), rng.randint(1, 10))
+    index = MoveIndex(board)
+    engine = HintEngine(board, index)
+    moves = sorted(index)
+    for rect in moves:
+        assert engine.conflicts(rect) == brute_conflicts(moves, rect)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_top_matches_full_sort(seed: int) -> None:
+    rng = random.Random(seed)
+    board = random_board(rng, rng.randint(2, 10), rng.randint(2, 17))
+    index = MoveIndex(board)
+    engine = HintEngine(board, index)
+    moves = sorted(index)
+    for k in (1, 3, len(moves) + 2):
+        by_apples = sorted(((board.count(m), m) for m in moves), reverse=True)[:k]
+        assert [(h.score, h.rect) for h in engine.top(k, "apples")] == by_apples
+        by_open = sorted(((-brute_conflicts(moves, m) - board.count(m) / 100, m) for m in moves), reverse=True)[:k]
+        assert [h.rect for h in engine.top(k, "open")] == [m for _, m in by_open]
+
+
+def test_top_follows_the_index_after_clears() -> None:
+    # 수를 둔 뒤에도 캐시한 겹침 표가 아니라 지금 남은 수로 고른다.
+    rng = random.Random(3)
+    board = Board.random(10, 17, rng)
+    index = MoveIndex(board)
+    engine = HintEngine(board, index)
+    while index:
+        hint = engine.top(1)[0]
+        assert hint.rect in index
+        moves = sorted(index)
+        assert hint.score == pytest.approx(max(-brute_conflicts(moves, m) - board.count(m) / 100 for m in moves))
+        index.remove(board.select(hint.rect))
+    assert engine.top(3) == []
+
+
+def test_custom_scorer() -> None:
+    board = Board.random(6, 6, random.Random(1))
+    index = MoveIndex(board)
+    hints = HintEngine(board, index).top(2, lambda engine, rect: -rect[0])
+    assert [h.rect for h in hints] == sorted(index, key=lambda m: (-m[0], m), reverse=True)[:2]
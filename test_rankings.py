@@ -0,0 +1,114 @@
+import json
+import random
+import sqlite3
+import threading
+from pathlib import Path
+
+from rankings import RankingStore
+
+
+def write_legacy(path: Path, count: int) -> list[dict[str, object]]:
+    rng = random.Random(count)
+    items = [{"name": f"p{i}", "score": rng.randrange(0, 500, 10), "time": f"t{i}"} for i in range(count)]
+    path.write_text(json.dumps(items), encoding="utf-8")
+    return items
+
+
+def row_count(db: Path) -> int:
+    conn = sqlite3.connect(str(db))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_migrates_json_once(tmp_path: Path) -> None:
+    legacy = tmp_path / "rankings.json"
+    items = write_legacy(legacy, 30)
+    db = tmp_path / "rankings.sqlite3"
+    store = RankingStore(db, legacy)
+    expected = sorted(items, key=lambda item: -int(item["score"]))[:10]
+    assert [item["score"] for item in store.top(10)] == [item["score"] for item in expected]
+    assert store.migrate_json(legacy) == 0
+    store.close()
+    # 다시 열어도 옮기지 않고, 원본 JSON은 그대로 남는다.
+    RankingStore(db, legacy).close()
+    assert row_count(db) == 30
+    assert json.loads(legacy.read_text(encoding="utf-8")) == items
+
+
+def test_concurrent_opens_migrate_once(tmp_path: Path) -> None:
+    legacy = tmp_path / "rankings.json"
+    write_legacy(legacy, 500)
+    # 경합은 타이밍에 따라 나므로 새 DB로 여러 번 해 본다.
+    for attempt in range(5):
+        db = tmp_path / f"rankings-{attempt}.sqlite3"
+        errors: list[Exception] = []
+        start = threading.Barrier(8)
+
+        def open_store() -> None:
+            start.wait()
+            try:
+                RankingStore(db, legacy, timeout=10).close()
+            except sqlite3.Error as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=open_store) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert row_count(db) == 500
+
+
+def test_skips_bad_legacy_entries(tmp_path: Path) -> None:
+    legacy = tmp_path / "rankings.json"
+    legacy.write_text(json.dumps([{"name": "a", "score": 20}, {"score": "x"}, "junk", {"name": "b" * 30, "score": "30"}]))
+    store = RankingStore(tmp_path / "r.sqlite3", legacy)
+    assert store.top() == [{"name": "b" * 20, "score": 30, "time": ""}, {"name": "a", "score": 20, "time": ""}]
+    store.close()
+
+
+def test_broken_or_missing_json_still_opens(tmp_path: Path) -> None:
+    legacy = tmp_path / "rankings.json"
+    legacy.write_text("{not json", encoding="utf-8")
+    store = RankingStore(tmp_path / "a.sqlite3", legacy)
+    assert store.top() == []
+    store.close()
+    store = RankingStore(tmp_path / "b.sqlite3", tmp_path / "missing.json")
+    assert store.top() == []
+    store.close()
+
+
+def test_top_orders_by_score_then_insertion(tmp_path: Path) -> None:
+    store = RankingStore(tmp_path / "r.sqlite3")
+    store.add("first", 50, "t1")
+    store.add_many([("second", 50, "t2", None), ("low", 10, "t3", None), ("high", 90, "t4", b"replay")])
+    assert [item["name"] for item in store.top(3)] == ["high", "first", "second"]
+    assert [item["name"] for item in store.top(1)] == ["high"]
+    store.close()
+
+
+def test_replay_round_trip(tmp_path: Path) -> None:
+    store = RankingStore(tmp_path / "r.sqlite3")
+    row_id = store.add("p", 10, "t", b"\x01\x02")
+    assert store.replay(row_id) == b"\x01\x02"
+    assert store.replay(store.add("q", 20, "t")) is None
+    assert store.replay(row_id + 100) is None
+    store.close()
+
+
+def test_adds_replay_column_to_old_files(tmp_path: Path) -> None:
+    db = tmp_path / "old.sqlite3"
+    conn = sqlite3.connect(str(db))
+    conn.executescript(
+        "CREATE TABLE scores (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, score INTEGER NOT NULL, time TEXT NOT NULL);"
+        "INSERT INTO scores (name, score, time) VALUES ('old', 40, 't');"
+    )
+    conn.commit()
+    conn.close()
+    store = RankingStore(db)
+    assert store.top() == [{"name": "old", "score": 40, "time": "t"}]
+    assert store.replay(store.add("new", 10, "t", b"r")) == b"r"
+    store.close()
@@ -0,0 +1,101 @@
+import random
+
+from renderer import NullBackend, RecordingBackend, Renderer
+
+
+def test_unchanged_options_are_not_sent_again() -> None:
+    backend = RecordingBackend()
+    renderer = Renderer(backend)
+    renderer.coords(1, 0, 0, 10, 10)
+    renderer.itemconfig(1, fill="red", state="normal")
+    renderer.itemconfig(2, text="SCORE 0")
+    renderer.flush()
+    assert backend.ops == [
+        ("coords", 1, (0, 0, 10, 10)),
+        ("itemconfig", 1, {"fill": "red", "state": "normal"}),
+        ("itemconfig", 2, {"text": "SCORE 0"}),
+    ]
+
+    # 같은 값을 다시 그려도 아무 호출도 없다.
+    backend.ops.clear()
+    for _ in range(3):
+        renderer.coords(1, 0, 0, 10, 10)
+        renderer.itemconfig(1, fill="red", state="normal")
+        renderer.itemconfig(2, text="SCORE 0")
+        renderer.flush()
+    assert backend.ops == []
+    assert renderer.skipped == 6
+
+    # 바뀐 옵션만 보낸다.
+    renderer.itemconfig(1, fill="blue", state="normal")
+    renderer.flush()
+    assert backend.ops == [("itemconfig", 1, {"fill": "blue"})]
+
+
+def test_changes_within_a_frame_collapse() -> None:
+    backend = RecordingBackend()
+    renderer = Renderer(backend)
+    renderer.itemconfig(1, state="normal")
+    renderer.flush()
+    backend.ops.clear()
+    # 한 프레임 안에서 숨겼다가 다시 보이면 호출이 없다.
+    renderer.itemconfig(1, state="hidden")
+    renderer.itemconfig(1, state="normal")
+    renderer.coords(3, 1, 2)
+    renderer.coords(3, 5, 6)
+    renderer.flush()
+    assert backend.ops == [("coords", 3, (5, 6))]
+
+
+def test_forget_sends_the_next_value_again() -> None:
+    backend = RecordingBackend()
+    renderer = Renderer(backend)
+    renderer.itemconfig(1, fill="red")
+    renderer.flush()
+    renderer.forget(1)
+    renderer.itemconfig(1, fill="red")
+    renderer.flush()
+    assert backend.ops == [("itemconfig", 1, {"fill": "red"}), ("itemconfig", 1, {"fill": "red"})]
+
+
+def test_schedule_flushes_once_per_frame() -> None:
+    scheduled = []
+    backend = NullBackend()
+    renderer = Renderer(backend, schedule=scheduled.append)
+    for item in range(10):
+        renderer.itemconfig(item, state="normal")
+    assert len(scheduled) == 1
+    scheduled.pop()()
+    assert backend.calls == 10 and renderer.frames == 1
+    renderer.itemconfig(0, state="hidden")
+    assert len(scheduled) == 1
+
+
+def test_random_frames_match_a_direct_canvas() -> None:
+    # 프레임마다 바뀐 것만 보내도, 모든 호출을 그대로 보낸 캔버스와 끝 상태가 같아야 한다.
+    rng = random.Random(5)
+    backend = RecordingBackend()
+    renderer = Renderer(backend)
+    direct: dict[int, dict[str, object]] = {}
+    shown: dict[int, dict[str, object]] = {}
+    for _ in range(200):
+        for _ in range(rng.randint(0, 20)):
+            item = rng.randrange(8)
+            if rng.random() < 0.3:
+                coords = (rng.randrange(3), rng.randrange(3))
+                renderer.coords(item, *coords)
+                direct.setdefault(item, {})["coords"] = coords
+            else:
+                option = {"state": rng.choice(("normal", "hidden")), "fill": rng.choice("rgb")}
+                key = rng.choice(list(option))
+                renderer.itemconfig(item, **{key: option[key]})
+                direct.setdefault(item, {})[key] = option[key]
+        before = len(backend.ops)
+        renderer.flush()
+        for kind, item, value in backend.ops[before:]:
+            if kind == "coords":
+                shown.setdefault(item, {})["coords"] = value
+            else:
+                shown.setdefault(item, {}).update(value)
+        assert shown == direct
+    assert renderer.sent == len(backend.ops) == backend.calls
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from engine import Board
+from solver import Solver, upper_bound
+
+
+def brute_clears(board: Board) -> int:
+    """전치표 없이 모든 순서를 다 둬 보고 가장 많이 지운 횟수를 구한다."""
+    best = 0
+    for move in board.find_moves():
+        child = board.copy()
+        child.remove(child.select(move))
+        best = max(best, 1 + brute_clears(child))
+    return best
+
+
+def tiny_board(rng: random.Random) -> Board:
+    # 작은 값이 많아야 여러 번 지우는 판이 나온다.
+    rows, cols = rng.randint(2, 4), rng.randint(2, 4)
+    return Board(rows, cols, bytes(0 if rng.random() < 0.1 else rng.randint(1, 5) for _ in range(rows * cols)))
+
+
+def check_line(board: Board, clears: int, moves: list[tuple[int, int, int, int]]) -> None:
+    # 돌려준 수열을 그대로 두면 모두 유효하고 그 뒤로 둘 수가 없어야 한다.
+    assert len(moves) == clears
+    board = board.copy()
+    for move in moves:
+        assert move in set(board.find_moves())
+        board.remove(board.select(move))
+    assert not any(True for _ in board.find_moves())
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_solver_matches_brute_force(seed: int) -> None:
+    board = tiny_board(random.Random(seed))
+    expected = brute_clears(board)
+    solution = Solver(board).solve()
+    assert solution.clears == expected
+    assert solution.score == expected * 10
+    assert expected <= upper_bound(board)
+    check_line(board, solution.clears, solution.moves)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_tiny_table_still_exact(seed: int) -> None:
+    # 항목 하나짜리 전치표는 계속 버리지만 답은 같아야 한다.
+    board = tiny_board(random.Random(100 + seed))
+    solver = Solver(board, max_entries=1)
+    solution = solver.solve()
+    assert solution.clears == brute_clears(board)
+    assert len(solver.table) <= 1
+    check_line(board, solution.clears, solution.moves)
+
+
+def test_solver_leaves_board_untouched() -> None:
+    board = Board.random(3, 4, random.Random(7))
+    before = bytes(board.values)
+    Solver(board).solve()
+    assert bytes(board.values) == before
+
+
+def test_rejects_empty_table() -> None:
+    with pytest.raises(ValueError):
+        Solver(Board(1, 1), max_entries=0)
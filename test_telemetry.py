@@ -0,0 +1,128 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from telemetry import (
+    END,
+    HIT,
+    MISS,
+    NO_MOVES,
+    RECORD,
+    SESSION_CSV_HEADER,
+    START,
+    TIMEOUT,
+    Histogram,
+    TelemetryWriter,
+    analyze,
+    analyze_file,
+    collect_files,
+    read_records,
+)
+
+
+def play_sessions(writer: TelemetryWriter, rng: random.Random, sessions: int) -> list[tuple[int, int, int, str]]:
+    """무작위 판을 기록하고 판마다 (맞춘 수, 틀린 수, 점수, 끝난 이유)를 돌려준다."""
+    expected = []
+    for session in range(sessions):
+        writer.write(START, session, 0, rng.randint(1, 60), 120, 10, 17)
+        hits = misses = 0
+        t = 0
+        for _ in range(rng.randint(0, 30)):
+            t += rng.randint(100, 3000)
+            if rng.random() < 0.7:
+                hits += 1
+                writer.write(HIT, session, t, rng.randint(0, 3000), rng.randint(0, 50), 4, 2, 10)
+            else:
+                misses += 1
+                writer.write(MISS, session, t, rng.randint(0, 3000), rng.randint(0, 50), 6, 3, 12)
+        if rng.random() < 0.8:
+            reason = rng.choice((TIMEOUT, NO_MOVES))
+            writer.write(END, session, t, hits * 10, hits + misses, 0, reason)
+            expected.append((hits, misses, hits * 10, ("timeout", "no_moves")[reason - 1]))
+        else:
+            expected.append((hits, misses, 0, "unfinished"))
+    return expected
+
+
+def test_writer_round_trip(tmp_path: Path) -> None:
+    writer = TelemetryWriter(tmp_path, flush_interval=0.01)
+    expected = play_sessions(writer, random.Random(1), 50)
+    writer.close()
+    assert writer.dropped == 0 and writer.errors == 0
+    files = collect_files([tmp_path])
+    assert len(files) == 1
+    csv = tmp_path / "sessions.csv"
+    summary = analyze(files, workers=1, sessions_path=csv)
+    assert summary.sessions == 50
+    lines = csv.read_text(encoding="utf-8").splitlines()
+    assert lines[0] + "\n" == SESSION_CSV_HEADER
+    rows = sorted((line.split(",") for line in lines[1:]), key=lambda row: int(row[0]))
+    assert [(int(r[5]), int(r[6]), int(r[7]), r[9]) for r in rows] == expected
+    assert summary.hist("session_moves").count == 50
+
+
+def test_writer_rotates_only_at_session_start(tmp_path: Path) -> None:
+    writer = TelemetryWriter(tmp_path, max_bytes=RECORD.size * 20, flush_interval=0.01)
+    play_sessions(writer, random.Random(2), 30)
+    writer.close()
+    files = collect_files([tmp_path])
+    assert len(files) > 1
+    # 파일마다 첫 레코드는 START이고, 한 판은 한 파일 안에만 있다.
+    owner: dict[int, Path] = {}
+    for path in files:
+        records = list(read_records(path))
+        assert records[0][0] == START
+        for record in records:
+            assert owner.setdefault(record[1], path) == path
+
+
+def test_writer_drops_after_close(tmp_path: Path) -> None:
+    writer = TelemetryWriter(tmp_path)
+    writer.close()
+    writer.write(START, 1, 0)
+    assert writer.dropped == 1
+    assert collect_files([tmp_path]) == []
+
+
+def test_reader_skips_torn_tail_and_rejects_foreign_files(tmp_path: Path) -> None:
+    writer = TelemetryWriter(tmp_path, flush_interval=0.01)
+    for i in range(10):
+        writer.write(HIT, 7, i, i)
+    writer.close()
+    (path,) = collect_files([tmp_path])
+    with path.open("ab") as f:
+        f.write(RECORD.pack(HIT, 7, 99, 1, 0, 0, 0, 0)[:10])
+    assert [record[3] for record in read_records(path, chunk_records=3)] == list(range(10))
+    foreign = tmp_path / "foreign.aptl"
+    foreign.write_bytes(b"NOPE\x01" + bytes(RECORD.size))
+    with pytest.raises(ValueError):
+        list(read_records(foreign))
+
+
+def test_parallel_analysis_matches_serial(tmp_path: Path) -> None:
+    rng = random.Random(3)
+    for part in range(4):
+        writer = TelemetryWriter(tmp_path / str(part), flush_interval=0.01)
+        play_sessions(writer, rng, 20)
+        writer.close()
+    files = collect_files([tmp_path / str(part) for part in range(4)])
+    serial = analyze(files, workers=1)
+    parallel = analyze(files, workers=2)
+    assert (serial.records, serial.sessions, serial.reasons) == (parallel.records, parallel.sessions, parallel.reasons)
+    assert {k: v.counts for k, v in serial.histograms.items()} == {k: v.counts for k, v in parallel.histograms.items()}
+    assert sum(analyze_file(path).records for path in files) == serial.records
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_histogram_percentiles_match_sorting(seed: int) -> None:
+    rng = random.Random(seed)
+    values = [rng.randint(0, 50) for _ in range(rng.randint(1, 300))]
+    histogram = Histogram()
+    for value in values:
+        histogram.add(value)
+    ordered = sorted(values)
+    points = (1, 50, 90, 99, 100)
+    expected = [ordered[min(len(values), max(1, round(len(values) * p / 100))) - 1] for p in points]
+    assert histogram.percentiles(*points) == expected
+    assert Histogram().percentiles(50) == [0]